@@ -1,8 +1,50 @@
 -- SUDO-GEN Table Schema
--- This file defines the structure of the login table.
+-- This file defines the tables used by the MySQL storage backend (sudogen_mysql.py).
+-- The SQLite backend creates the same tables itself.
+-- password_hash holds "pbkdf2_sha256$<iterations>$<salt>$<digest>" as written by
+-- sudogen_auth.hash_password; plaintext passwords are never stored.
 
 CREATE TABLE IF NOT EXISTS `login` (
   `username` VARCHAR(255) NOT NULL,
-  `password` VARCHAR(255) NOT NULL,
+  `password_hash` VARCHAR(255) NOT NULL,
   PRIMARY KEY (`username`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `game_sessions` (
+  `session_id` VARCHAR(32) NOT NULL,
+  `username` VARCHAR(255) NOT NULL,
+  `puzzle_id` VARCHAR(64) NOT NULL, -- puzzle_id() hash, or the seed_id of a seeded puzzle
+  `difficulty` VARCHAR(16) NOT NULL,
+  `puzzle` VARCHAR(625) NOT NULL, -- One character per cell, up to 25x25
+  `solution` VARCHAR(625) NOT NULL,
+  `started_at` DOUBLE NOT NULL,
+  `ended_at` DOUBLE NULL,
+  `wrong_attempts` INT NOT NULL DEFAULT 0,
+  `hints_used` INT NOT NULL DEFAULT 0,
+  `solved` BOOLEAN NOT NULL DEFAULT FALSE,
+  `solve_seconds` DOUBLE NULL,
+  PRIMARY KEY (`session_id`),
+  KEY `game_sessions_user` (`username`, `started_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `game_moves` (
+  `session_id` VARCHAR(32) NOT NULL,
+  `seq` INT NOT NULL,
+  `at` DOUBLE NOT NULL,
+  `kind` VARCHAR(8) NOT NULL,
+  `cell_row` TINYINT NOT NULL,
+  `cell_col` TINYINT NOT NULL,
+  `value` TINYINT NOT NULL,
+  PRIMARY KEY (`session_id`, `seq`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `puzzles` (
+  `id` BIGINT NOT NULL AUTO_INCREMENT,
+  `label` VARCHAR(16) NOT NULL,
+  `puzzle` CHAR(81) NOT NULL,
+  `solution` CHAR(81) NOT NULL,
+  `solved` BOOLEAN NOT NULL, -- The puzzle's grade, as the grader's solved flag
+  `steps` VARCHAR(255) NOT NULL, -- and technique counts in JSON (see sudogen_core.grade_from_steps)
+  PRIMARY KEY (`id`),
+  KEY `puzzles_label` (`label`, `id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+Password hashing for stored accounts: salted PBKDF2-HMAC-SHA256 with a tunable cost.
+
+Hashes are stored as "pbkdf2_sha256$<iterations>$<salt>$<digest>" (salt and digest in
+base64), so raising PASSWORD_HASH_ITERATIONS only affects new hashes and old ones keep
+verifying with the count they were made with.
+"""
+import base64
+import hashlib
+import hmac
+import os
+
+HASH_SCHEME = "pbkdf2_sha256"
+# Each login costs one derivation at this many rounds (about 0.2 s at 600k on one core);
+# lower it for more logins per second, raise it to make stolen hashes slower to crack
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("SUDOGEN_HASH_ITERATIONS", 600_000))
+SALT_BYTES = 16
+
+
+def _derive(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+
+def hash_password(password, iterations=None):
+    """Returns an encoded salted hash of password for storing in the database."""
+    iterations = PASSWORD_HASH_ITERATIONS if iterations is None else iterations
+    salt = os.urandom(SALT_BYTES)
+    digest = _derive(password, salt, iterations)
+    return "$".join((HASH_SCHEME, str(iterations),
+                     base64.b64encode(salt).decode("ascii"), base64.b64encode(digest).decode("ascii")))
+
+
+def _parse(encoded):
+    scheme, iterations, salt, digest = encoded.split("$")
+    if scheme != HASH_SCHEME:
+        raise ValueError(f"Unknown password hash scheme: {scheme!r}")
+    return int(iterations), base64.b64decode(salt), base64.b64decode(digest)
+
+
+def verify_password(password, encoded):
+    """True if password matches an encoded hash from hash_password."""
+    try:
+        iterations, salt, digest = _parse(encoded)
+    except ValueError:
+        return False
+    return hmac.compare_digest(_derive(password, salt, iterations), digest)
+
+
+def needs_rehash(encoded, iterations=None):
+    """True if encoded was made with a different cost than the current setting."""
+    iterations = PASSWORD_HASH_ITERATIONS if iterations is None else iterations
+    try:
+        return _parse(encoded)[0] != iterations
+    except ValueError:
+        return True
+
+
+# Verified against when the username does not exist, so unknown and known names take equally long
+_DUMMY_HASH = None
+
+def dummy_verify(password):
+    """Spends the same time as verify_password on a real account, then returns False."""
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = hash_password("")
+    verify_password(password, _DUMMY_HASH)
+    return False
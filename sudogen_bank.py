@@ -0,0 +1,149 @@
+"""Pre-generated puzzle bank: a compact file format read through mmap."""
+import mmap
+import os
+import random
+import shutil
+import struct
+import tempfile
+
+from sudogen_core import GRID_SIZE, TECHNIQUE_SCORES, grade_from_steps
+
+PUZZLE_BANK_FILE = "puzzles.sgpb" # Optional pre-generated puzzles, built with the 'bank' command
+
+# --- Puzzle Bank File ---
+# Layout: header, label index, then fixed-size records grouped by label.
+# Each record packs the solution at 4 bits per cell, an 81-bit mask of the givens and the
+# puzzle's grade, so record k of a label sits at a computable offset and can be read without scanning.
+
+BANK_MAGIC = b"SGPB"
+BANK_VERSION = 2
+BANK_HEADER = struct.Struct("<4sHHI") # magic, version, record size, label count
+BANK_LABEL = struct.Struct("<II") # first record, record count (after a length-prefixed label)
+CELL_COUNT = GRID_SIZE * GRID_SIZE
+SOLUTION_BYTES = (CELL_COUNT + 1) // 2
+MASK_BYTES = (CELL_COUNT + 7) // 8
+# A grade is kept as whether the grader solved the puzzle and how often it used each
+# technique, in TECHNIQUE_SCORES order; band, score and hardest follow from those
+BANK_GRADE = struct.Struct("<?%dH" % len(TECHNIQUE_SCORES))
+BANK_RECORD_SIZE = SOLUTION_BYTES + MASK_BYTES + BANK_GRADE.size
+
+def pack_puzzle(full_board, puzzle, grade):
+    """Packs a solution, its puzzle and the puzzle's grade into one BANK_RECORD_SIZE-byte record."""
+    cells = [num for row in full_board for num in row] + [0]
+    givens = 0
+    for i, num in enumerate(num for row in puzzle for num in row):
+        if num != 0: givens |= 1 << i
+    packed = bytes(cells[i] << 4 | cells[i + 1] for i in range(0, CELL_COUNT, 2))
+    counts = [grade.steps.get(name, 0) for name in TECHNIQUE_SCORES]
+    return packed + givens.to_bytes(MASK_BYTES, "little") + BANK_GRADE.pack(grade.solved, *counts)
+
+def unpack_puzzle(record):
+    """Inverse of pack_puzzle: returns (full_board, puzzle, grade)."""
+    cells = []
+    for byte in record[:SOLUTION_BYTES]:
+        cells.append(byte >> 4)
+        cells.append(byte & 0x0F)
+    givens = int.from_bytes(record[SOLUTION_BYTES:BANK_RECORD_SIZE], "little")
+    full_board = [cells[r * GRID_SIZE:(r + 1) * GRID_SIZE] for r in range(GRID_SIZE)]
+    puzzle = [[num if givens >> (r * GRID_SIZE + c) & 1 else 0 for c, num in enumerate(row)]
+              for r, row in enumerate(full_board)]
+    solved, *counts = BANK_GRADE.unpack_from(record, SOLUTION_BYTES + MASK_BYTES)
+    steps = {name: count for name, count in zip(TECHNIQUE_SCORES, counts) if count}
+    return full_board, puzzle, grade_from_steps(steps, solved)
+
+def bank_label(difficulty):
+    """Index key used for a difficulty: band names as-is, blank counts as their decimal string."""
+    return difficulty if isinstance(difficulty, str) else str(int(difficulty))
+
+def write_puzzle_bank(path, entries):
+    """
+    Writes (difficulty, full_board, puzzle, grade) entries to a bank file at path.
+    Records are spooled to one temporary file per label so memory use does not
+    grow with the number of entries; the finished file replaces path atomically.
+    """
+    spools = {}
+    try:
+        for difficulty, full_board, puzzle, grade in entries:
+            label = bank_label(difficulty)
+            if label not in spools:
+                spools[label] = [tempfile.TemporaryFile(), 0]
+            spools[label][0].write(pack_puzzle(full_board, puzzle, grade))
+            spools[label][1] += 1
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as out:
+            out.write(BANK_HEADER.pack(BANK_MAGIC, BANK_VERSION, BANK_RECORD_SIZE, len(spools)))
+            first = 0
+            for label, (_, count) in spools.items():
+                encoded = label.encode("utf-8")
+                out.write(bytes([len(encoded)]) + encoded + BANK_LABEL.pack(first, count))
+                first += count
+            for spool, _ in spools.values():
+                spool.seek(0)
+                shutil.copyfileobj(spool, out)
+        os.replace(tmp_path, path)
+    finally:
+        for spool, _ in spools.values():
+            spool.close()
+
+class PuzzleBank:
+    """Read-only, memory-mapped puzzle bank; fetching a puzzle touches only its own record."""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # mmap refuses empty files
+            self._file.close()
+            raise ValueError(f"{path} is not a puzzle bank")
+        try:
+            magic, version, record_size, label_count = BANK_HEADER.unpack_from(self._map, 0)
+        except struct.error: # Shorter than a header
+            magic = None
+        if magic != BANK_MAGIC or version != BANK_VERSION or record_size != BANK_RECORD_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not a version {BANK_VERSION} puzzle bank")
+        self.index = {}
+        offset = BANK_HEADER.size
+        for _ in range(label_count):
+            length = self._map[offset]
+            label = self._map[offset + 1:offset + 1 + length].decode("utf-8")
+            offset += 1 + length
+            self.index[label] = BANK_LABEL.unpack_from(self._map, offset)
+            offset += BANK_LABEL.size
+        self._data_offset = offset
+
+    def labels(self):
+        return list(self.index)
+
+    def count(self, difficulty):
+        """Number of puzzles stored for difficulty (0 if the bank has none)."""
+        return self.index.get(bank_label(difficulty), (0, 0))[1]
+
+    def get(self, difficulty, k):
+        """Returns (full_board, puzzle, grade) for the k-th puzzle of difficulty."""
+        first, count = self.index[bank_label(difficulty)]
+        if not 0 <= k < count:
+            raise IndexError(f"puzzle {k} out of range for {difficulty!r} ({count} stored)")
+        start = self._data_offset + (first + k) * BANK_RECORD_SIZE
+        return unpack_puzzle(self._map[start:start + BANK_RECORD_SIZE])
+
+    def random(self, difficulty, rng=random):
+        """Returns a random (full_board, puzzle, grade) of difficulty in O(1)."""
+        return self.get(difficulty, rng.randrange(self.count(difficulty)))
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_puzzle_bank(path=PUZZLE_BANK_FILE):
+    """Opens the bank at path, or returns None if it is missing or unreadable."""
+    try:
+        return PuzzleBank(path)
+    except (OSError, ValueError):
+        return None
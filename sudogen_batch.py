@@ -0,0 +1,257 @@
+"""Background and batch puzzle generation, and the headless command line tools."""
+import argparse
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from sudogen_core import (BOX_SIZE, DEFAULT_DIFFICULTY, NEW_GAME_TIMEOUT, GradeResult, SearchCancelled,
+                          board_to_string, count_blanks, make_puzzle, string_to_board)
+from sudogen_symmetry import CanonicalIndex, apply_transform, canonical_form, random_transform
+from sudogen_bank import PUZZLE_BANK_FILE, write_puzzle_bank
+from sudogen_cache import PUZZLE_CACHE
+from sudogen_storage import DB_BANK, StorageError, open_storage
+
+# --- Background Pre-generation ---
+
+class PuzzleProducer:
+    """
+    Keeps a small bounded queue of ready puzzles per difficulty, refilled by a
+    background thread, so starting a new game is a queue pop instead of a generation.
+    Puzzles have box_size x box_size boxes; the bank is only used for 9x9.
+    """
+    def __init__(self, difficulties=(DEFAULT_DIFFICULTY,), size=3, bank=None, box_size=BOX_SIZE):
+        self.bank = bank
+        self.box_size = box_size
+        self.queues = {difficulty: queue.Queue(maxsize=size) for difficulty in difficulties}
+        self._stop = threading.Event()
+        self._wake = threading.Event() # Set whenever a puzzle is taken
+        self._thread = threading.Thread(target=self._run, name="puzzle-producer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            produced = False
+            for difficulty, ready in self.queues.items():
+                if self._stop.is_set(): return
+                if not ready.full():
+                    try:
+                        ready.put(self._produce(difficulty))
+                    except SearchCancelled:
+                        return
+                    produced = True
+            if not produced:
+                self._wake.wait()
+                self._wake.clear()
+
+    def _produce(self, difficulty):
+        """Makes one puzzle on the producer thread; SearchCancelled once close() is called."""
+        return make_puzzle(difficulty, self.bank, self.box_size, cancel=self._stop)
+
+    def get(self, difficulty=DEFAULT_DIFFICULTY, timeout=0):
+        """
+        Pops a ready (full_board, puzzle, grade), waiting up to timeout seconds for the
+        producer, and falls back to generating one synchronously if none is ready, for at
+        most about NEW_GAME_TIMEOUT seconds.
+        """
+        ready = self.queues.get(difficulty)
+        if ready is not None:
+            try:
+                puzzle = ready.get(timeout=timeout) if timeout > 0 else ready.get_nowait()
+                self._wake.set()
+                return puzzle
+            except queue.Empty:
+                pass
+        return make_puzzle(difficulty, self.bank, self.box_size, timeout=NEW_GAME_TIMEOUT)
+
+    def seeded(self, key):
+        """The puzzle a seed_id names, such as a daily puzzle's, from this process's PUZZLE_CACHE."""
+        return PUZZLE_CACHE.get(key)
+
+    def close(self, timeout=5):
+        """Stops the producer thread, abandoning any puzzle it is generating."""
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+# --- Headless Batch Generation ---
+
+DEDUP_ALLOWANCE = 0.05 # With dedup, extra puzzles requested per puzzle still needed, to cover duplicates
+
+def _generate_batch_chunk(start_index, count, difficulty, seed, variants_per_seed=1, canonical=False):
+    """
+    Process-pool worker: generates count puzzles and returns them as JSON-ready records.
+    Every variants_per_seed-th puzzle is generated from scratch; the ones in between are
+    symmetry transforms of it, which share its grade and cost microseconds each.
+    Each generated puzzle and its variants draw from random.Random(seed + its index), so a
+    record depends only on seed and index, not on how the batch was split or on the
+    process's global random state; start_index must be a multiple of variants_per_seed.
+    With canonical=True each record also carries the puzzle's canonical form.
+    """
+    records = []
+    for index in range(start_index, start_index + count):
+        started = time.perf_counter()
+        variant = index % variants_per_seed
+        if variant == 0:
+            rng = random.Random(seed + index)
+            base_board, base_puzzle, grade = make_puzzle(difficulty, rng=rng)
+            full_board, puzzle = base_board, base_puzzle
+        else:
+            transform = random_transform(rng)
+            full_board, puzzle = apply_transform(base_board, transform), apply_transform(base_puzzle, transform)
+        records.append({
+            "index": index,
+            "puzzle": board_to_string(puzzle),
+            "solution": board_to_string(full_board),
+            "blanks": count_blanks(puzzle),
+            "band": grade.band,
+            "score": grade.score,
+            "hardest": grade.hardest,
+            "solved": grade.solved,
+            "steps": grade.steps,
+            "seed": seed,
+            "variant": variant,
+        })
+        if canonical:
+            records[-1]["canonical"] = canonical_form(puzzle)
+        records[-1]["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return records
+
+def generate_batch(count, difficulty=DEFAULT_DIFFICULTY, workers=None, chunk_size=50, seed=None, variants_per_seed=1,
+                   dedup=None):
+    """
+    Generates count puzzles on a process pool and yields records as chunks finish.
+    Chunks hold at most chunk_size puzzles and are small enough to give every worker
+    a share of small batches; at most two per worker are in flight, so memory stays
+    bounded however large count is. Records arrive out of order; each carries its index,
+    and with a seed the same records come out whatever workers and chunk_size are.
+    With variants_per_seed > 1, each generated puzzle is followed by that many
+    symmetry-derived variants in total (see derive_variants).
+    With dedup (a CanonicalIndex), workers also compute canonical forms, puzzles
+    already in the index are dropped and generation continues until count are yielded.
+    """
+    if variants_per_seed < 1:
+        raise ValueError("variants_per_seed must be at least 1")
+    if dedup is not None and variants_per_seed > 1:
+        raise ValueError("dedup would drop every symmetry-derived variant; use variants_per_seed=1")
+    workers = workers or os.cpu_count() or 1
+    if seed is None:
+        seed = int.from_bytes(os.urandom(4), "big")
+    # ceil(count / workers) each, so small batches still use every worker, in whole variant groups
+    share = min(chunk_size, -(-count // workers))
+    share = max(variants_per_seed, share - share % variants_per_seed)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {} # future -> puzzles it was asked for
+        next_start = 0
+        produced = 0
+        while produced < count:
+            # Only what is still needed is requested: without dedup exactly count puzzles in all;
+            # with it, DEDUP_ALLOWANCE more to cover duplicates, and more again as they are dropped
+            need = count - produced
+            if dedup is not None:
+                need += int(need * DEDUP_ALLOWANCE)
+                share = min(chunk_size, -(-need // workers))
+            wanted = need - sum(pending.values())
+            while len(pending) < workers * 2 and wanted > 0:
+                size = min(share, wanted)
+                pending[pool.submit(_generate_batch_chunk, next_start, size, difficulty, seed,
+                                    variants_per_seed, dedup is not None)] = size
+                next_start += size
+                wanted -= size
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                for record in future.result():
+                    if produced >= count: break
+                    if dedup is not None and not dedup.add(record["canonical"]): continue
+                    produced += 1
+                    yield record
+        for future in pending:
+            future.cancel()
+
+def batch_main(argv):
+    """Command line entry point: python SudoGenProject.py batch -n COUNT [options]."""
+    parser = argparse.ArgumentParser(prog="SudoGenProject.py batch", description="Generate Sudoku puzzles headlessly.")
+    parser.add_argument("-n", "--count", type=int, required=True, help="number of puzzles to generate")
+    parser.add_argument("-d", "--difficulty", default=DEFAULT_DIFFICULTY,
+                        help="difficulty band name or a blank count (default: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=50, help="puzzles per worker task")
+    parser.add_argument("--format", choices=("jsonl", "line"), default="jsonl",
+                        help="jsonl records with solution and metadata, or bare 81-character puzzle lines")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--seed", type=int, default=None, help="base seed for reproducible runs")
+    parser.add_argument("--variants-per-seed", type=int, default=1,
+                        help="puzzles drawn from each generated grid by symmetry transforms (default: %(default)s)")
+    parser.add_argument("--dedup", nargs="?", const="", default=None, metavar="INDEX_FILE",
+                        help="drop puzzles equivalent under symmetry to one already produced; "
+                             "with INDEX_FILE, the index is kept on disk across runs")
+    args = parser.parse_args(argv)
+    if args.dedup is not None and args.variants_per_seed > 1:
+        parser.error("--dedup cannot be combined with --variants-per-seed")
+
+    difficulty = int(args.difficulty) if args.difficulty.isdigit() else args.difficulty
+    dedup = CanonicalIndex(args.dedup or None) if args.dedup is not None else None
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    started = time.perf_counter()
+    written = 0
+    try:
+        for record in generate_batch(args.count, difficulty, args.workers, args.chunk_size, args.seed,
+                                     args.variants_per_seed, dedup):
+            if args.format == "line":
+                out.write(record["puzzle"] + "\n")
+            else:
+                out.write(json.dumps(record) + "\n")
+            written += 1
+            if written % args.chunk_size == 0: out.flush()
+    finally:
+        if out is not sys.stdout: out.close()
+        if dedup is not None: dedup.close()
+    elapsed = time.perf_counter() - started
+    print(f"Generated {written} puzzles in {elapsed:.1f}s ({written / max(elapsed, 1e-9):.1f}/s)", file=sys.stderr)
+    return 0
+
+def bank_main(argv):
+    """Command line entry point: python SudoGenProject.py bank OUTPUT -n COUNT -d DIFFICULTY [-d ...]."""
+    parser = argparse.ArgumentParser(prog="SudoGenProject.py bank", description="Build a pre-generated puzzle bank.")
+    parser.add_argument("output", nargs="?", default=PUZZLE_BANK_FILE,
+                        help="bank file to write, or %s to add the puzzles to the database "
+                             "(default: %%(default)s)" % DB_BANK)
+    parser.add_argument("-n", "--count", type=int, required=True, help="puzzles per difficulty")
+    parser.add_argument("-d", "--difficulty", action="append",
+                        help="difficulty band or blank count; repeat for several (default: %s)" % DEFAULT_DIFFICULTY)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=None, help="base seed for reproducible runs")
+    args = parser.parse_args(argv)
+
+    difficulties = [int(d) if d.isdigit() else d for d in (args.difficulty or [DEFAULT_DIFFICULTY])]
+    written = {}
+    def entries():
+        for difficulty in difficulties:
+            for record in generate_batch(args.count, difficulty, args.workers, seed=args.seed):
+                # A band's closest miss is filed under the band it did grade into
+                label = record["band"] if isinstance(difficulty, str) else difficulty
+                written[label] = written.get(label, 0) + 1
+                grade = GradeResult(**{field: record[field] for field in GradeResult._fields})
+                yield label, string_to_board(record["solution"]), string_to_board(record["puzzle"]), grade
+    started = time.perf_counter()
+    if args.output == DB_BANK:
+        try:
+            with open_storage() as storage:
+                storage.add_puzzles(entries())
+        except StorageError as err:
+            print(f"Could not add the puzzles to the database: {err}", file=sys.stderr)
+            return 1
+    else:
+        write_puzzle_bank(args.output, entries())
+    counts = ", ".join(f"{count} {label}" for label, count in written.items())
+    print(f"Wrote {sum(written.values())} puzzles ({counts}) to {args.output} in {time.perf_counter() - started:.1f}s",
+          file=sys.stderr)
+    return 0
+
+# Headless subcommands of SudoGenProject.py
+COMMANDS = {"batch": batch_main, "bank": bank_main}
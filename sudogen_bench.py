@@ -0,0 +1,293 @@
+"""
+Headless benchmarks for the solver, generator, game state and rendering hot paths.
+
+    python SudoGenProject.py bench -o bench.json
+    python SudoGenProject.py bench --baseline bench.json
+
+Every benchmark reseeds the random module with a fixed seed first, so two runs time the
+same boards. Results are per call, in microseconds, summarised as percentiles and written
+as JSON; compared against a baseline file, any benchmark whose median slowed down by more
+than the threshold is reported as a regression and the command exits with status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from sudogen_core import (GRID_SIZE, GridState, count_solutions, create_puzzle, find_empty,
+                          generate_full_board, grade_puzzle, is_valid, seed_id, solve, string_to_board,
+                          SOLVER_BACKENDS)
+from sudogen_cache import PuzzleCache
+
+BENCH_SEED = 20240601
+BENCH_FORMAT_VERSION = 1
+REGRESSION_THRESHOLD = 0.15 # Median slowdown, as a fraction of the baseline, that counts as a regression
+PERCENTILES = (50, 90, 99)
+
+# Well-known hard puzzles, each with a unique solution; solve times vary a lot between them
+HARD_PUZZLES = [string_to_board(text) for text in (
+    "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+    "1.......2.9.4...5...6...7...5.9.3.......7.......85..4.7.....6...3...9.8...2.....1",
+    "7.8...3.....6.1...5.........4.....263...8.......1...9..9.2....4....7.5...........",
+    "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    "52...6.........7.13...........4..8..6......5...........418.........3..2...87.....",
+    "6.....8.3.4.7.................5.4.7.3..2.....1.6.......2.....5.....8.6......1....",
+)]
+CREATE_PUZZLE_BLANKS = (30, 45, 58)
+
+
+def percentile(ordered, pct):
+    """Linearly interpolated pct-th percentile of an already sorted list."""
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * pct / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(samples, number):
+    """Per-call statistics in microseconds for a list of sample durations in seconds, each of number calls."""
+    per_call = sorted(sample / number * 1e6 for sample in samples)
+    stats = {"unit": "us", "samples": len(per_call), "number": number,
+             "min": per_call[0], "mean": sum(per_call) / len(per_call), "max": per_call[-1]}
+    for pct in PERCENTILES:
+        stats[f"p{pct}"] = percentile(per_call, pct)
+    return stats
+
+
+def time_samples(func, repeat, number):
+    """Runs func number times per sample, repeat samples; returns the sample durations in seconds."""
+    func() # Warm-up: caches, lazily built tables
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _cycle(items):
+    """A zero-argument function returning the next element of items on each call, round-robin."""
+    state = {"i": -1}
+    def next_item():
+        state["i"] = (state["i"] + 1) % len(items)
+        return items[state["i"]]
+    return next_item
+
+
+def _seeded_puzzle(blanks):
+    full_board = generate_full_board()
+    return full_board, create_puzzle(full_board, blanks, unique=True)
+
+
+# --- Benchmarks ---
+# Each setup function runs after random.seed(BENCH_SEED) and returns (func, repeat, number);
+# func is what gets timed.
+
+def bench_is_valid():
+    full_board, puzzle = _seeded_puzzle(45)
+    empty = [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE) if puzzle[r][c] == 0]
+    cells = _cycle([(num, pos) for pos in empty for num in range(1, GRID_SIZE + 1)])
+    return lambda: is_valid(puzzle, *cells()), 50, 2000
+
+def bench_find_empty():
+    last_blank = generate_full_board() # Worst case: the only blank is the last cell scanned
+    last_blank[GRID_SIZE - 1][GRID_SIZE - 1] = 0
+    next_board = _cycle([last_blank, _seeded_puzzle(20)[1], _seeded_puzzle(58)[1]])
+    return lambda: find_empty(next_board()), 50, 1000
+
+def _bench_solve(backend):
+    def setup():
+        next_board = _cycle(HARD_PUZZLES)
+        # solve() fills the board in, so each call gets a fresh copy
+        return lambda: solve([row[:] for row in next_board()], backend), 5 * len(HARD_PUZZLES), 1
+    return setup
+
+def bench_count_solutions():
+    next_board = _cycle(HARD_PUZZLES)
+    return lambda: count_solutions(next_board(), limit=2), 5 * len(HARD_PUZZLES), 1
+
+def bench_seeded_puzzle_hit():
+    cache = PuzzleCache()
+    keys = [seed_id(seed, 45) for seed in range(10)]
+    for key in keys:
+        cache.get(key) # Generated here, so the timed calls are all hits
+    next_key = _cycle(keys)
+    return lambda: cache.get(next_key()), 50, 1000
+
+def bench_generate_full_board():
+    return generate_full_board, 100, 1
+
+def _bench_create_puzzle(blanks, unique):
+    def setup():
+        next_board = _cycle([generate_full_board() for _ in range(10)])
+        return lambda: create_puzzle(next_board(), blanks, unique=unique), 30, 1
+    return setup
+
+def bench_grade_puzzle():
+    next_board = _cycle([_seeded_puzzle(58)[1] for _ in range(5)])
+    return lambda: grade_puzzle(next_board()), 25, 1
+
+def bench_check_completion():
+    full_board, puzzle = _seeded_puzzle(45)
+    state = GridState(puzzle=(full_board, puzzle, None))
+    blanks = [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE) if puzzle[r][c] == 0]
+    for r, c in blanks[::2]: # Half filled in, one of them wrong
+        state.select_cell(r, c)
+        state.place_number(full_board[r][c])
+    r, c = blanks[1]
+    state.select_cell(r, c)
+    state.place_number(full_board[r][c] % GRID_SIZE + 1)
+    return state.check_completion, 50, 10000
+
+def bench_next_step():
+    # Singles are read off the candidate grid; the hard puzzles' openings need LogicalSolver
+    states = []
+    for puzzle in HARD_PUZZLES[:2]:
+        full_board = [row[:] for row in puzzle]
+        solve(full_board)
+        states.append(GridState(puzzle=(full_board, puzzle, None)))
+    states.append(GridState(puzzle=(*_seeded_puzzle(45), None)))
+    next_state = _cycle(states)
+    return lambda: next_state().next_step(), 30, 100
+
+def bench_render_frame(pencil_marks=False, dirty=True):
+    """
+    One BoardRenderer.draw of a half-played board to an offscreen surface: dirty redraws
+    every cell and the info panel (as after invalidate()), clean has nothing to redraw.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from sudogen_game import HEIGHT, WIDTH, BoardRenderer, Grid
+    pygame.font.init()
+    font = pygame.font.SysFont("Inter", 40)
+    small_font = pygame.font.SysFont("Times New Roman", 16)
+    renderer = BoardRenderer(pygame.Surface((WIDTH, HEIGHT)), font, small_font)
+    full_board, puzzle = _seeded_puzzle(45)
+    grid = Grid(puzzle=(full_board, puzzle, None))
+    grid.pencil_marks = pencil_marks
+    for r, c in [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE) if puzzle[r][c] == 0][::3]:
+        grid.select_cell(r, c)
+        grid.place_number(full_board[r][c])
+    renderer.draw(grid)
+    def frame():
+        if dirty: renderer.invalidate()
+        renderer.draw(grid)
+    return frame, 200, 1
+
+BENCHMARKS = [
+    ("is_valid", bench_is_valid),
+    ("find_empty", bench_find_empty),
+    *[(f"solve[{backend}]", _bench_solve(backend)) for backend in SOLVER_BACKENDS],
+    ("count_solutions", bench_count_solutions),
+    ("seeded_puzzle[hit]", bench_seeded_puzzle_hit),
+    ("generate_full_board", bench_generate_full_board),
+    *[(f"create_puzzle[{blanks}]", _bench_create_puzzle(blanks, False)) for blanks in CREATE_PUZZLE_BLANKS],
+    *[(f"create_puzzle[{blanks},unique]", _bench_create_puzzle(blanks, True)) for blanks in CREATE_PUZZLE_BLANKS],
+    ("grade_puzzle", bench_grade_puzzle),
+    ("check_completion", bench_check_completion),
+    ("next_step", bench_next_step),
+    ("render_frame[dirty]", bench_render_frame),
+    ("render_frame[dirty,marks]", lambda: bench_render_frame(pencil_marks=True)),
+    ("render_frame[clean]", lambda: bench_render_frame(dirty=False)),
+]
+
+
+def run_benchmarks(names=None, seed=BENCH_SEED, repeat_scale=1.0, progress=None):
+    """
+    Runs the benchmarks whose names contain one of names (all if None) and returns the
+    results document: run metadata plus per-benchmark statistics from summarize().
+    Benchmarks that cannot run here (e.g. render_frame without pygame) are left out.
+    """
+    results = {}
+    for name, setup in BENCHMARKS:
+        if names and not any(part in name for part in names):
+            continue
+        random.seed(seed)
+        try:
+            func, repeat, number = setup()
+        except ImportError as err:
+            if progress: progress(f"{name:<28} skipped ({err})")
+            continue
+        samples = time_samples(func, max(3, round(repeat * repeat_scale)), number)
+        results[name] = summarize(samples, number)
+        if progress: progress(_format_row(name, results[name]))
+    return {
+        "version": BENCH_FORMAT_VERSION,
+        "seed": seed,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def compare_to_baseline(results, baseline):
+    """Returns [(name, current_p50, baseline_p50, change)] for benchmarks in both, change being the relative slowdown."""
+    rows = []
+    for name, stats in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or not base.get("p50"):
+            continue
+        rows.append((name, stats["p50"], base["p50"], stats["p50"] / base["p50"] - 1))
+    return rows
+
+
+def _format_row(name, stats):
+    return (f"{name:<28} p50 {stats['p50']:>11.1f} us  p90 {stats['p90']:>11.1f} us  "
+            f"p99 {stats['p99']:>11.1f} us  ({stats['samples']} x {stats['number']})")
+
+
+def bench_main(argv):
+    """Command line entry point: python SudoGenProject.py bench [options]."""
+    parser = argparse.ArgumentParser(prog="SudoGenProject.py bench",
+                                     description="Time the solver, generator and rendering hot paths.")
+    parser.add_argument("-k", "--select", action="append", metavar="NAME",
+                        help="only run benchmarks whose name contains NAME (repeatable)")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="median slowdown that counts as a regression (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=BENCH_SEED, help="seed for the benchmark inputs")
+    parser.add_argument("--quick", action="store_true", help="take a fifth of the samples")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, _ in BENCHMARKS:
+            print(name)
+        return 0
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = run_benchmarks(args.select, args.seed, 0.2 if args.quick else 1.0, progress=print)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+    if baseline is None:
+        return 0
+    if baseline.get("seed") != results["seed"]:
+        print(f"warning: baseline was run with seed {baseline.get('seed')}, this run with {results['seed']}",
+              file=sys.stderr)
+    regressions = 0
+    print(f"\nAgainst {args.baseline} (regression above +{args.threshold:.0%} on p50):")
+    for name, current, base, change in compare_to_baseline(results, baseline):
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{name:<28} {base:>11.1f} -> {current:>11.1f} us  {change:>+7.1%}{flag}")
+    if regressions:
+        print(f"{regressions} benchmark(s) regressed", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,134 @@
+"""
+Seeded puzzles by ID, with an in-process LRU cache in front of the generator.
+
+A seed_id such as "medium:9:2026-10-18" names exactly one puzzle (see make_puzzle's
+seed), so shared links, daily challenges and replays look it up here and only the
+first request in a process pays for generating it.
+
+    full_board, puzzle, grade = daily_puzzle("hard")
+    full_board, puzzle, grade = PUZZLE_CACHE.get("medium:9:42")
+"""
+import datetime
+import threading
+from collections import OrderedDict
+
+import sudogen_metrics as metrics
+from sudogen_core import (BOX_SIZE, DEFAULT_DIFFICULTY, board_to_bytes, bytes_to_board, make_puzzle,
+                          parse_seed_id, seed_id)
+
+CACHE_MAX_CELLS = 2 * 81 * 4096 # Board and solution cells the shared cache holds: 4096 9x9 puzzles, or 530 25x25
+
+
+def _unpack(entry):
+    """A cached entry as boards (lists of rows) the caller may change without touching the cache."""
+    full_board, board, grade = entry
+    return bytes_to_board(full_board), bytes_to_board(board), grade
+
+
+class PuzzleCache:
+    """
+    LRU cache of seeded puzzles keyed by seed_id, bounded by size rather than count:
+    entries are kept as board_to_bytes bytes, one byte per cell, and each weighs the
+    cells of its puzzle and solution (162 on 9x9, 1250 on 25x25),
+    and the least recently used entries are evicted once the total passes max_cells.
+    Safe to share between threads; when several miss on the same ID at once, one of them
+    generates the puzzle and the others wait for it.
+    """
+    def __init__(self, max_cells=CACHE_MAX_CELLS):
+        self.max_cells = max_cells
+        self.cells = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # seed_id -> (full_board, puzzle, grade) as bytes, least recently used first
+        self._pending = {} # seed_id -> Event set once its generation finishes
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def lookup(self, key):
+        """The cached puzzle for key (a copy), or None; counts a hit or a miss."""
+        with self._lock:
+            puzzle = self._entries.get(key)
+            if puzzle is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if metrics.enabled: metrics.count("cache.miss" if puzzle is None else "cache.hit")
+        return None if puzzle is None else _unpack(puzzle)
+
+    def put(self, key, puzzle):
+        """Stores puzzle under key as the most recently used entry, evicting the least recently used past max_cells."""
+        full_board, board, grade = puzzle
+        full_board, board = board_to_bytes(full_board), board_to_bytes(board)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.cells -= 2 * len(old[1])
+            self._entries[key] = (full_board, board, grade)
+            self.cells += 2 * len(board)
+            while self.cells > self.max_cells and len(self._entries) > 1:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self.cells -= 2 * len(evicted)
+                self.evictions += 1
+
+    def get(self, key):
+        """
+        The puzzle a seed_id names, from the cache or generated and cached. The ID is
+        normalized first (so "45:9:7" and "045:9:7" share an entry); ValueError if malformed.
+        """
+        seed, difficulty, box_size = parse_seed_id(key)
+        key = seed_id(seed, difficulty, box_size)
+        while True:
+            puzzle = self.lookup(key)
+            if puzzle is not None:
+                return puzzle
+            with self._lock:
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    break
+            pending.wait() # Another thread is generating it; then look again
+        try:
+            puzzle = make_puzzle(difficulty, box_size=box_size, seed=seed)
+            self.put(key, puzzle)
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+        return puzzle # The cache holds its own bytes copy
+
+    def clear(self):
+        """Drops every entry; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.cells = 0
+
+    def stats(self):
+        """Entry count, size and hit/miss/eviction counters, for display or logging."""
+        with self._lock:
+            return {"entries": len(self._entries), "cells": self.cells, "max_cells": self.max_cells,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+PUZZLE_CACHE = PuzzleCache() # Shared by everything in this process
+
+
+def seeded_puzzle(seed, difficulty=DEFAULT_DIFFICULTY, box_size=BOX_SIZE, cache=PUZZLE_CACHE):
+    """make_puzzle(difficulty, box_size=box_size, seed=seed), through cache."""
+    return cache.get(seed_id(seed, difficulty, box_size))
+
+
+def daily_seed(date=None):
+    """Seed of the daily puzzle for date (default today, local time): its ISO date, e.g. "2026-10-18"."""
+    return (date or datetime.date.today()).isoformat()
+
+
+def daily_puzzle(difficulty=DEFAULT_DIFFICULTY, date=None, box_size=BOX_SIZE, cache=PUZZLE_CACHE):
+    """The day's puzzle in a difficulty: the same for everyone on that date, generated once per process."""
+    return seeded_puzzle(daily_seed(date), difficulty, box_size, cache)
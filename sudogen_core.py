@@ -0,0 +1,1418 @@
+"""Headless Sudoku engine: solvers, generation, grading and game state. Importing it has no side effects."""
+import hashlib
+import math
+from array import array
+import random
+import time
+from collections import namedtuple
+from itertools import combinations
+
+import sudogen_metrics as metrics
+
+# Sudoku Constants
+GRID_SIZE=9
+BOX_SIZE = 3
+BOX_SIZES = (2, 3, 4, 5) # Supported box sizes: 4x4, 9x9, 16x16 and 25x25 grids
+MAX_WRONG = 3
+
+# Sudoku Logic Functions
+
+def box_size_of(board):
+    """Box size of a square board (3 for 9x9, 4 for 16x16, ...); ValueError for unsupported sizes."""
+    box = math.isqrt(len(board))
+    if box * box != len(board) or box not in BOX_SIZES:
+        raise ValueError(f"Unsupported board size {len(board)}; expected one of {[b * b for b in BOX_SIZES]}")
+    return box
+
+def is_valid(board, num, pos):
+    """Checks if placing num at pos is valid according to Sudoku rules."""
+    row, col = pos
+    size = len(board)
+    # Check row
+    for i in range(size):
+        if board[row][i] == num and col != i: return False
+    # Check column
+    for i in range(size):
+        if board[i][col] == num and row != i: return False
+    # Check box
+    box = math.isqrt(size)
+    box_x = col // box
+    box_y = row // box
+    for i in range(box_y * box, box_y * box + box):
+        for j in range(box_x * box, box_x * box + box):
+            if board[i][j] == num and (i, j) != pos: return False
+    return True
+
+def find_empty(board):
+    """Finds the next empty cell (0) on the board."""
+    for i, row in enumerate(board):
+        for j, num in enumerate(row):
+            if num == 0: return (i, j)
+    return None
+
+# Search limits
+
+# Why a bounded search stopped without an answer, as SolveResult.status and SearchBudget.stopped
+SOLVED = "solved"
+NO_SOLUTION = "no_solution"
+BUDGET_EXCEEDED = "budget_exceeded" # Out of nodes or past the deadline
+CANCELLED = "cancelled"
+
+SolveResult = namedtuple("SolveResult", ["status", "board", "nodes"])
+
+class SearchCancelled(Exception):
+    """Generation was stopped through its cancel token before it produced a puzzle."""
+
+class SearchBudget:
+    """
+    Limits for one search: at most max_nodes nodes, for at most timeout seconds, and
+    only until cancel (a threading.Event, or anything with is_set()) is set. Every
+    search engine calls spend() once per node; the clock and the token are looked at
+    every CHECK_INTERVAL nodes so the check stays cheap next to the work of a node.
+    """
+    __slots__ = ("max_nodes", "deadline", "cancel", "nodes", "stopped")
+    CHECK_INTERVAL = 16
+
+    def __init__(self, max_nodes=None, timeout=None, cancel=None):
+        self.max_nodes = max_nodes
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.cancel = cancel
+        self.nodes = 0
+        self.stopped = None # BUDGET_EXCEEDED or CANCELLED once spend() has returned False
+
+    def spend(self):
+        """Counts one node; returns False once the search has to stop, with the reason in stopped."""
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            self.stopped = BUDGET_EXCEEDED
+        elif self.nodes % self.CHECK_INTERVAL == 0:
+            if self.cancel is not None and self.cancel.is_set():
+                self.stopped = CANCELLED
+            elif self.deadline is not None and time.monotonic() >= self.deadline:
+                self.stopped = BUDGET_EXCEEDED
+        return self.stopped is None
+
+# Bitmask constraint engine for 9x9: bit (num - 1) of a mask stands for digit num.
+FULL_MASK = (1 << GRID_SIZE) - 1
+MASK_DIGITS = [tuple(n + 1 for n in range(GRID_SIZE) if m >> n & 1) for m in range(FULL_MASK + 1)]
+MASK_COUNT = [len(digits) for digits in MASK_DIGITS]
+
+class ConstraintBoard:
+    """Keeps per-row, per-column and per-box digit bitmasks for a board in sync with place/unplace."""
+    def __init__(self, board):
+        self.board = board
+        self.rows = [0] * GRID_SIZE
+        self.cols = [0] * GRID_SIZE
+        self.boxes = [0] * GRID_SIZE
+        self.empties = set()
+        self.consistent = True
+        self.nodes = 0 # Search nodes visited, reported to sudogen_metrics
+        for r in range(GRID_SIZE):
+            for c in range(GRID_SIZE):
+                num = board[r][c]
+                if num == 0:
+                    self.empties.add((r, c))
+                    continue
+                bit = 1 << (num - 1)
+                b = (r // 3) * 3 + c // 3
+                if (self.rows[r] | self.cols[c] | self.boxes[b]) & bit:
+                    self.consistent = False # Clue clashes with another clue
+                self.rows[r] |= bit
+                self.cols[c] |= bit
+                self.boxes[b] |= bit
+
+    def candidates(self, row, col):
+        """Returns the bitmask of digits that can still go at (row, col)."""
+        return FULL_MASK & ~(self.rows[row] | self.cols[col] | self.boxes[(row // 3) * 3 + col // 3])
+
+    def place(self, row, col, num):
+        """Writes num to the board and marks it used in its row, column and box."""
+        bit = 1 << (num - 1)
+        self.board[row][col] = num
+        self.rows[row] |= bit
+        self.cols[col] |= bit
+        self.boxes[(row // 3) * 3 + col // 3] |= bit
+        self.empties.discard((row, col))
+
+    def unplace(self, row, col, num):
+        """Clears (row, col) and releases num in its row, column and box."""
+        bit = ~(1 << (num - 1))
+        self.board[row][col] = 0
+        self.rows[row] &= bit
+        self.cols[col] &= bit
+        self.boxes[(row // 3) * 3 + col // 3] &= bit
+        self.empties.add((row, col))
+
+    def most_constrained(self):
+        """Returns (row, col, candidates) for the empty cell with the fewest candidates (MRV), or None when full."""
+        best = None
+        best_count = GRID_SIZE + 1
+        rows, cols, boxes = self.rows, self.cols, self.boxes
+        for r, c in self.empties:
+            mask = FULL_MASK & ~(rows[r] | cols[c] | boxes[(r // 3) * 3 + c // 3])
+            count = MASK_COUNT[mask]
+            if count < best_count:
+                best, best_count = (r, c, mask), count
+                if count <= 1: break # Can't do better than a forced or dead cell
+        return best
+
+    def _walk(self, shuffle=None, budget=None):
+        """
+        Depth-first over the most constrained cells, on an explicit stack of (row, col,
+        digits, next digit index) frames. Yields each time the board is full; stepping
+        it further backtracks. When budget runs out every placement is undone first.
+        """
+        stack = []
+        descend = True
+        while True:
+            if descend:
+                self.nodes += 1
+                if budget is not None and not budget.spend():
+                    for row, col, nums, k in stack:
+                        self.unplace(row, col, nums[k - 1])
+                    return
+                cell = self.most_constrained()
+                if cell is None:
+                    yield
+                else:
+                    row, col, mask = cell
+                    nums = MASK_DIGITS[mask]
+                    if shuffle is not None:
+                        nums = list(nums)
+                        shuffle(nums)
+                    stack.append([row, col, nums, 0])
+            if not stack: return
+            frame = stack[-1]
+            row, col, nums, k = frame
+            if k: self.unplace(row, col, nums[k - 1])
+            if k == len(nums):
+                stack.pop()
+                descend = False
+                continue
+            frame[3] = k + 1
+            self.place(row, col, nums[k])
+            descend = True
+
+    def search(self, shuffle=None, budget=None):
+        """Fills the board in (True), or leaves it as it was if there is no solution or budget runs out (False); shuffle randomizes digit order."""
+        for _ in self._walk(shuffle, budget):
+            return True
+        return False
+
+    def solutions(self, budget=None):
+        """Yields a copy of every completed board reachable from the current state."""
+        for _ in self._walk(None, budget):
+            yield [row[:] for row in self.board]
+
+class DancingLinks:
+    """Algorithm X over the 4 * size**2 Sudoku exact-cover constraints (324 for 9x9), stored as Dancing Links index arrays."""
+    # Column headers are 1..4 * size**2 (node 0 is the root): cell, row-digit, column-digit and box-digit constraints.
+
+    def __init__(self, board):
+        self.size = len(board)
+        self.box = box_size_of(board)
+        n = 4 * self.size * self.size
+        self.L = [n] + list(range(n))
+        self.R = list(range(1, n + 1)) + [0]
+        self.U = list(range(n + 1))
+        self.D = list(range(n + 1))
+        self.C = list(range(n + 1))
+        self.S = [0] * (n + 1)
+        self.choice = [None] * (n + 1) # Node -> (row, col, num) of the candidate it belongs to
+        self.consistent = True
+        self.nodes = 0 # Rows tried during search, reported to sudogen_metrics
+        givens = []
+        for r in range(self.size):
+            for c in range(self.size):
+                if board[r][c] != 0:
+                    givens.append(self._add_row(r, c, board[r][c]))
+                else:
+                    for num in range(1, self.size + 1):
+                        self._add_row(r, c, num)
+        # Clues are part of every solution, so select their rows up front
+        covered = set()
+        for node in givens:
+            row_cols = [self.C[node], self.C[self.R[node]], self.C[self.R[self.R[node]]], self.C[self.L[node]]]
+            if covered.intersection(row_cols):
+                self.consistent = False # Two clues claim the same constraint
+                return
+            covered.update(row_cols)
+            self._select(node)
+
+    def _add_row(self, row, col, num):
+        """Appends the four nodes of candidate (row, col, num) and returns the first one."""
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        size = self.size
+        cells = size * size
+        box = (row // self.box) * self.box + col // self.box
+        first = len(C)
+        for k, column in enumerate((1 + row * size + col,
+                                    1 + cells + row * size + num - 1,
+                                    1 + 2 * cells + col * size + num - 1,
+                                    1 + 3 * cells + box * size + num - 1)):
+            node = first + k
+            C.append(column)
+            U.append(U[column])
+            D.append(column)
+            D[U[column]] = node
+            U[column] = node
+            S[column] += 1
+            L.append(first + (k - 1) % 4)
+            R.append(first + (k + 1) % 4)
+            self.choice.append((row, col, num))
+        return first
+
+    def _cover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def _select(self, node):
+        """Covers every column of the row containing node."""
+        self._cover(self.C[node])
+        j = self.R[node]
+        while j != node:
+            self._cover(self.C[j])
+            j = self.R[j]
+
+    def _deselect(self, node):
+        j = self.L[node]
+        while j != node:
+            self._uncover(self.C[j])
+            j = self.L[j]
+        self._uncover(self.C[node])
+
+    def _search(self, budget=None):
+        """
+        Algorithm X on an explicit stack of the row node selected at each depth; yields
+        the list of picked (row, col, num) at every exact cover. When budget runs out
+        every selection is undone first.
+        """
+        R, D, C, S = self.R, self.D, self.C, self.S
+        picked = []
+        stack = []
+        while True:
+            node = None # Next row to try; None means backtrack
+            c = R[0]
+            if c == 0:
+                yield picked
+            else:
+                # Branch on the column with the fewest remaining rows
+                best, size = c, S[c]
+                while c != 0 and size > 0:
+                    if S[c] < size: best, size = c, S[c]
+                    c = R[c]
+                if size > 0: node = D[best]
+            while node is None:
+                if not stack: return
+                last = stack.pop()
+                picked.pop()
+                self._deselect(last)
+                node = D[last]
+                if node == C[last]: node = None # Back at the column header: this depth is exhausted
+            self.nodes += 1
+            if budget is not None and not budget.spend():
+                while stack:
+                    self._deselect(stack.pop())
+                return
+            self._select(node)
+            stack.append(node)
+            picked.append(self.choice[node])
+
+    def solutions(self, board, budget=None):
+        """Yields a completed copy of board for every exact cover."""
+        if not self.consistent: return
+        for picked in self._search(budget):
+            solution = [row[:] for row in board]
+            for row, col, num in picked:
+                solution[row][col] = num
+            yield solution
+
+_GEOMETRY = {} # Box size -> (size, units, unit indices of each cell, peers of each cell), built on first use
+
+def _geometry(box):
+    """Units and peers of the box*box grid, with cells numbered r * size + c."""
+    geometry = _GEOMETRY.get(box)
+    if geometry is None:
+        size = box * box
+        units = ([tuple(r * size + c for c in range(size)) for r in range(size)]
+                 + [tuple(r * size + c for r in range(size)) for c in range(size)]
+                 + [tuple((b // box * box + k // box) * size + b % box * box + k % box for k in range(size))
+                    for b in range(size)])
+        cell_units = [[] for _ in range(size * size)]
+        for u, unit in enumerate(units):
+            for i in unit:
+                cell_units[i].append(u)
+        peers = [tuple(sorted({p for u in cell_units[i] for p in units[u]} - {i})) for i in range(size * size)]
+        geometry = _GEOMETRY[box] = (size, units, [tuple(u) for u in cell_units], peers)
+    return geometry
+
+class PropagationBoard:
+    """
+    Solver for every supported size, 4x4 to 25x25. Each cell keeps a bitmask of its
+    candidates; naked singles (a cell down to one digit) and hidden singles (a digit down to
+    one cell of a unit) are propagated to a fixed point before every guess, which prunes
+    the big grids enough to fill a 25x25 in well under a second. The search is an explicit
+    stack of candidate-list copies, so its depth is not bounded by the recursion limit.
+    """
+    def __init__(self, board):
+        self.box = box_size_of(board)
+        self.size, self.units, self.cell_units, self.peers = _geometry(self.box)
+        self.full = (1 << self.size) - 1
+        self.nodes = 0 # Guesses made during search, reported to sudogen_metrics
+        size, box = self.size, self.box
+        rows, cols, boxes = [0] * size, [0] * size, [0] * size
+        self.consistent = True
+        for r, row in enumerate(board):
+            for c, num in enumerate(row):
+                if num == 0: continue
+                bit = 1 << (num - 1)
+                b = (r // box) * box + c // box
+                if (rows[r] | cols[c] | boxes[b]) & bit:
+                    self.consistent = False # Clue clashes with another clue
+                rows[r] |= bit
+                cols[c] |= bit
+                boxes[b] |= bit
+        # Clues already struck their digit from their peers through the masks; only new singles are queued
+        self.cands = cands = []
+        queue = []
+        for r, row in enumerate(board):
+            for c, num in enumerate(row):
+                if num != 0:
+                    cands.append(1 << (num - 1))
+                    continue
+                m = self.full & ~(rows[r] | cols[c] | boxes[(r // box) * box + c // box])
+                if m & (m - 1) == 0: queue.append(len(cands))
+                cands.append(m)
+        self.consistent = self.consistent and 0 not in cands and self._propagate(cands, queue)
+
+    def solved(self):
+        """True if propagation alone has fixed every cell."""
+        return self.consistent and all(m & (m - 1) == 0 for m in self.cands)
+
+    def _propagate(self, cands, queue, dirty=None):
+        """
+        Applies naked and hidden singles until nothing changes; False on a contradiction.
+        Only the dirty units (indices into units; all of them if None), and those whose
+        cells lose a candidate on the way, are scanned for hidden singles.
+        """
+        peers, units, cell_units, full = self.peers, self.units, self.cell_units, self.full
+        dirty = set(range(len(units))) if dirty is None else dirty
+        while True:
+            while queue:
+                i = queue.pop()
+                bit = cands[i]
+                for p in peers[i]:
+                    m = cands[p]
+                    if m & bit:
+                        m ^= bit
+                        if m == 0: return False
+                        cands[p] = m
+                        dirty.update(cell_units[p])
+                        if m & (m - 1) == 0: queue.append(p)
+            if not dirty: return True
+            scan, dirty = dirty, set()
+            for u in scan:
+                unit = units[u]
+                once = twice = 0
+                for i in unit:
+                    m = cands[i]
+                    twice |= once & m
+                    once |= m
+                if once != full: return False # Some digit has nowhere left to go
+                only = once & ~twice
+                while only:
+                    bit = only & -only
+                    only ^= bit
+                    for i in unit:
+                        if cands[i] & bit:
+                            if cands[i] != bit:
+                                cands[i] = bit
+                                queue.append(i)
+                                dirty.update(cell_units[i])
+                            break
+
+    def _branch(self, cands, shuffle):
+        """Search frame (cands, cell, digit bits to try) for the open cell with the fewest candidates, or None when solved."""
+        best, best_count = -1, self.size + 1
+        for i, m in enumerate(cands):
+            if m & (m - 1):
+                count = bin(m).count("1")
+                if count < best_count:
+                    best, best_count = i, count
+                    if count == 2: break
+        if best < 0: return None
+        m = cands[best]
+        bits = []
+        while m:
+            bit = m & -m
+            bits.append(bit)
+            m ^= bit
+        if shuffle is not None: shuffle(bits)
+        else: bits.reverse() # Popped from the end, so the smallest digit is tried first
+        return cands, best, bits
+
+    def _search(self, shuffle=None, budget=None):
+        """Yields the candidate list of each solution, depth first, until budget runs out."""
+        if not self.consistent: return
+        frame = self._branch(self.cands, shuffle)
+        if frame is None:
+            yield self.cands
+            return
+        stack = [frame]
+        while stack:
+            cands, i, bits = stack[-1]
+            if not bits:
+                stack.pop()
+                continue
+            self.nodes += 1
+            if budget is not None and not budget.spend(): return
+            child = cands[:]
+            child[i] = bits.pop()
+            if not self._propagate(child, [i], set(self.cell_units[i])): continue
+            frame = self._branch(child, shuffle)
+            if frame is None: yield child
+            else: stack.append(frame)
+
+    def _to_board(self, cands):
+        size = self.size
+        return [[cands[r * size + c].bit_length() for c in range(size)] for r in range(size)]
+
+    def solutions(self, shuffle=None, budget=None):
+        """Yields every solution as a new board (digits in random order with shuffle, e.g. random.shuffle)."""
+        for cands in self._search(shuffle, budget):
+            yield self._to_board(cands)
+
+def _propagation_solutions(board, budget=None):
+    engine = PropagationBoard(board)
+    try:
+        yield from engine.solutions(budget=budget)
+    finally:
+        if metrics.enabled: metrics.count("solve.nodes.propagation", engine.nodes)
+
+def _bitmask_solutions(board, budget=None):
+    if len(board) != GRID_SIZE: # ConstraintBoard's tables are 9x9 only
+        yield from _propagation_solutions(board, budget)
+        return
+    engine = ConstraintBoard([row[:] for row in board])
+    try:
+        if engine.consistent:
+            yield from engine.solutions(budget)
+    finally: # Also runs when the caller stops iterating early
+        if metrics.enabled: metrics.count("solve.nodes.bitmask", engine.nodes)
+
+def _dlx_solutions(board, budget=None):
+    engine = DancingLinks(board)
+    try:
+        yield from engine.solutions(board, budget)
+    finally:
+        if metrics.enabled: metrics.count("solve.nodes.dlx", engine.nodes)
+
+# Solver backends, selected by name in solve/count_solutions/find_solutions
+SOLVER_BACKENDS = {
+    "bitmask": _bitmask_solutions,
+    "dlx": _dlx_solutions,
+    "propagation": _propagation_solutions,
+}
+DEFAULT_SOLVER = "bitmask"
+
+def iter_solutions(board, backend=DEFAULT_SOLVER, budget=None):
+    """
+    Yields every solution of board (as new boards) using the chosen solver backend.
+    With a SearchBudget it stops early once that runs out; budget.stopped says so.
+    """
+    if backend not in SOLVER_BACKENDS:
+        raise ValueError(f"Unknown solver backend {backend!r}; choose from {sorted(SOLVER_BACKENDS)}")
+    return SOLVER_BACKENDS[backend](board, budget)
+
+def solve(board, backend=DEFAULT_SOLVER, budget=None):
+    """Solves the Sudoku board in place (used to verify solvable); False if unsolvable or budget ran out first."""
+    with metrics.timer("solve"):
+        if backend == "bitmask" and len(board) == GRID_SIZE:
+            engine = ConstraintBoard(board)
+            if not engine.consistent: return False
+            solved = engine.search(budget=budget)
+            if metrics.enabled: metrics.count("solve.nodes.bitmask", engine.nodes)
+            return solved
+        for solution in iter_solutions(board, backend, budget):
+            for r, row in enumerate(solution):
+                board[r][:] = row
+            return True
+        return False
+
+def solve_bounded(board, max_nodes=None, timeout=None, cancel=None, backend=DEFAULT_SOLVER):
+    """
+    Solves a copy of board within a node budget, a timeout in seconds and a cancel token
+    (see SearchBudget), any of which may be None. Returns SolveResult(status, board, nodes):
+    status SOLVED with the solution, or NO_SOLUTION, BUDGET_EXCEEDED or CANCELLED with None.
+    """
+    budget = SearchBudget(max_nodes, timeout, cancel)
+    solution = [row[:] for row in board]
+    if solve(solution, backend, budget):
+        return SolveResult(SOLVED, solution, budget.nodes)
+    return SolveResult(budget.stopped or NO_SOLUTION, None, budget.nodes)
+
+def count_solutions(board, limit=None, backend=DEFAULT_SOLVER, budget=None):
+    """Counts the solutions of board, stopping early once limit is reached (or budget runs out)."""
+    count = 0
+    for _ in iter_solutions(board, backend, budget):
+        count += 1
+        if limit is not None and count >= limit: break
+    return count
+
+def find_solutions(board, limit=None, backend=DEFAULT_SOLVER, budget=None):
+    """Returns a list of up to limit solutions of board (all of them when limit is None)."""
+    found = []
+    for solution in iter_solutions(board, backend, budget):
+        found.append(solution)
+        if limit is not None and len(found) >= limit: break
+    return found
+
+# Search nodes a random fill may use per cell before it is abandoned for a fresh one.
+# Fills need about one node per cell; the rare one that wanders into a dead end is
+# cheaper to restart than to dig out of.
+FILL_NODES_PER_CELL = 3
+
+def generate_full_board(box_size=BOX_SIZE, cancel=None, rng=random):
+    """
+    Generates a fully solved Sudoku board with box_size x box_size boxes (9x9 by default).
+    Each random fill gets a node budget and is restarted with fresh random choices when it
+    runs out, so no single bad branch can stall it. Raises SearchCancelled once cancel is set.
+    rng supplies the random choices; a seeded random.Random makes the board reproducible.
+    """
+    size = box_size * box_size
+    with metrics.timer("generate.fill"):
+        while True:
+            board = [[0] * size for _ in range(size)]
+            budget = SearchBudget(FILL_NODES_PER_CELL * size * size, cancel=cancel)
+            if box_size == BOX_SIZE:
+                engine = ConstraintBoard(board)
+                filled = engine.search(rng.shuffle, budget)
+            else:
+                engine = PropagationBoard(board)
+                board = next(engine.solutions(rng.shuffle, budget), None)
+                filled = board is not None
+            if metrics.enabled: metrics.count("generate.fill.nodes", engine.nodes)
+            if filled: return board
+            if budget.stopped == CANCELLED: raise SearchCancelled()
+            if metrics.enabled: metrics.count("generate.fill.restarts")
+
+def count_blanks(board):
+    """Counts the number of empty cells (0) in the puzzle."""
+    return sum(row.count(0) for row in board)
+
+def has_unique_solution(board, backend=DEFAULT_SOLVER, budget=None):
+    """True if board has exactly one solution; the counter stops as soon as it finds a second. False if budget runs out first."""
+    return count_solutions(board, 2, backend, budget) == 1 and (budget is None or budget.stopped is None)
+
+# Nodes a 9x9 uniqueness check in create_puzzle may use; past it the blank is put back
+UNIQUE_CHECK_NODE_BUDGET = 10000
+
+def _still_unique(puzzle):
+    """Whether a puzzle that had one solution before its last blank still has one (see create_puzzle)."""
+    with metrics.timer("create_puzzle.verify"):
+        if len(puzzle) == GRID_SIZE:
+            return has_unique_solution(puzzle, budget=SearchBudget(UNIQUE_CHECK_NODE_BUDGET))
+        # Counting solutions of a big grid is slow; singles alone fixing every cell proves it unique
+        return PropagationBoard(puzzle).solved()
+
+def create_puzzle(full_board, difficulty_level=40, unique=False, cancel=None, rng=random):
+    """
+    Removes a certain number of cells from the full board to create a puzzle.
+    With unique=True, cells are removed one at a time in random order and any removal
+    that gives the puzzle a second solution is put back, so fewer than difficulty_level
+    cells may end up blank. A removal whose check runs past UNIQUE_CHECK_NODE_BUDGET is
+    put back too. Grids other than 9x9 keep a blank only while naked and hidden singles
+    still solve the puzzle, which stops 25x25 grids at a little over half blank.
+    Raises SearchCancelled once cancel is set. rng picks the cells, as in generate_full_board.
+    """
+    size = len(full_board)
+    puzzle = [row[:] for row in full_board]
+    with metrics.timer("create_puzzle.remove"):
+        if unique:
+            cells = [(r, c) for r in range(size) for c in range(size)]
+            rng.shuffle(cells) # Each cell is tried once, so no retries on an emptying board
+            removed = 0
+            for row, col in cells:
+                if removed >= difficulty_level: break
+                num = puzzle[row][col]
+                puzzle[row][col] = 0
+                if cancel is not None and cancel.is_set(): raise SearchCancelled()
+                if _still_unique(puzzle):
+                    removed += 1
+                else:
+                    puzzle[row][col] = num
+            return puzzle
+        cells_to_remove = difficulty_level
+        while cells_to_remove > 0:
+            row, col = rng.randint(0, size - 1), rng.randint(0, size - 1)
+            if puzzle[row][col] != 0:
+                puzzle[row][col] = 0
+                cells_to_remove -= 1
+        return puzzle
+
+# Logical Difficulty Grading
+
+# Cell indices run 0..80 row by row; units are the 9 rows, 9 columns and 9 boxes.
+ROW_UNITS = [tuple(r * GRID_SIZE + c for c in range(GRID_SIZE)) for r in range(GRID_SIZE)]
+COL_UNITS = [tuple(r * GRID_SIZE + c for r in range(GRID_SIZE)) for c in range(GRID_SIZE)]
+BOX_UNITS = [tuple((b // 3 * 3 + k // 3) * GRID_SIZE + b % 3 * 3 + k % 3 for k in range(GRID_SIZE)) for b in range(GRID_SIZE)]
+UNITS = ROW_UNITS + COL_UNITS + BOX_UNITS
+CELL_ROW = [i // GRID_SIZE for i in range(GRID_SIZE * GRID_SIZE)]
+CELL_COL = [i % GRID_SIZE for i in range(GRID_SIZE * GRID_SIZE)]
+CELL_BOX = [(i // GRID_SIZE // 3) * 3 + i % GRID_SIZE // 3 for i in range(GRID_SIZE * GRID_SIZE)]
+PEERS = [tuple(sorted(set(ROW_UNITS[CELL_ROW[i]] + COL_UNITS[CELL_COL[i]] + BOX_UNITS[CELL_BOX[i]]) - {i}))
+         for i in range(GRID_SIZE * GRID_SIZE)]
+
+# Techniques in the order they are tried, with the score each one contributes
+TECHNIQUE_SCORES = {
+    "hidden_single": 1,
+    "naked_single": 2,
+    "pointing": 3,
+    "box_line": 3,
+    "naked_pair": 4,
+    "hidden_pair": 5,
+    "naked_triple": 6,
+    "hidden_triple": 7,
+    "x_wing": 8,
+    "swordfish": 9,
+}
+GUESSING_SCORE = 10 # Puzzle needs more than the techniques above
+
+# Difficulty bands by hardest technique score (upper bound inclusive)
+DIFFICULTY_BANDS = [("easy", 2), ("medium", 3), ("hard", 7), ("expert", 9), ("extreme", GUESSING_SCORE)]
+# Blanks a puzzle aimed at each band gets, or more until it reaches the band (see dig_puzzle);
+# other grid sizes scale them
+BAND_BLANKS = {"easy": 42, "medium": 50, "hard": 54, "expert": 56, "extreme": 60}
+# Digs generate_graded_puzzle tries per band before taking the closest puzzle; few grids
+# have a puzzle that needs a fish but no guess, so expert gets the most
+BAND_ATTEMPTS = {"easy": 100, "medium": 100, "hard": 100, "expert": 500, "extreme": 100}
+DEFAULT_DIFFICULTY = "medium"
+
+GradeResult = namedtuple("GradeResult", ["band", "score", "hardest", "solved", "steps"])
+
+def band_for_score(score):
+    """Maps a technique score to its difficulty band name."""
+    for name, limit in DIFFICULTY_BANDS:
+        if score <= limit: return name
+    return DIFFICULTY_BANDS[-1][0]
+
+class LogicalSolver:
+    """
+    Solves a puzzle the way a person would, one technique at a time.
+    Candidates are kept as per-cell bitmasks and only the 20 peers of a
+    placed cell are touched, so nothing is rebuilt between steps.
+    """
+    def __init__(self, board):
+        self.values = [0] * (GRID_SIZE * GRID_SIZE)
+        self.cands = [FULL_MASK] * (GRID_SIZE * GRID_SIZE)
+        self.unsolved = GRID_SIZE * GRID_SIZE
+        self.broken = False # Set when a cell or unit runs out of options
+        self.steps = {}
+        for i in range(GRID_SIZE * GRID_SIZE):
+            num = board[CELL_ROW[i]][CELL_COL[i]]
+            if num != 0:
+                if not self.cands[i] >> (num - 1) & 1: self.broken = True
+                self.assign(i, num)
+
+    def assign(self, i, num):
+        """Fills cell i and strikes num from its peers."""
+        values, cands = self.values, self.cands
+        values[i] = num
+        cands[i] = 0
+        self.unsolved -= 1
+        keep = ~(1 << (num - 1))
+        for p in PEERS[i]:
+            if cands[p] & ~keep:
+                cands[p] &= keep
+                if cands[p] == 0 and values[p] == 0: self.broken = True
+
+    def eliminate(self, cells, mask):
+        """Removes mask from the candidates of cells; returns True if anything changed."""
+        cands = self.cands
+        changed = False
+        for i in cells:
+            if cands[i] & mask:
+                cands[i] &= ~mask
+                changed = True
+                if cands[i] == 0 and self.values[i] == 0: self.broken = True
+        return changed
+
+    def _positions(self, unit):
+        """Per-digit bitmask of the positions (0-8) within unit that still allow that digit."""
+        cands = self.cands
+        pos = [0] * GRID_SIZE
+        for k, i in enumerate(unit):
+            m = cands[i]
+            while m:
+                low = m & -m
+                pos[low.bit_length() - 1] |= 1 << k
+                m ^= low
+        return pos
+
+    # --- Techniques: each applies what it finds and returns True on progress ---
+
+    def naked_single(self):
+        cands, values = self.cands, self.values
+        progress = False
+        for i in range(GRID_SIZE * GRID_SIZE):
+            m = cands[i]
+            if values[i] == 0 and m and m & (m - 1) == 0:
+                self.assign(i, m.bit_length())
+                progress = True
+        return progress
+
+    def hidden_single(self):
+        cands = self.cands
+        progress = False
+        for unit in UNITS:
+            once = twice = 0
+            for i in unit:
+                m = cands[i]
+                twice |= once & m
+                once |= m
+            only = once & ~twice
+            while only:
+                low = only & -only
+                only ^= low
+                for i in unit:
+                    if cands[i] & low:
+                        self.assign(i, low.bit_length())
+                        progress = True
+                        break
+        return progress
+
+    def pointing(self):
+        # A digit confined to one row/column inside a box leaves the rest of that line
+        progress = False
+        for b, unit in enumerate(BOX_UNITS):
+            for d, where in enumerate(self._positions(unit)):
+                if where == 0: continue
+                cells = [unit[k] for k in range(GRID_SIZE) if where >> k & 1]
+                rows = {CELL_ROW[i] for i in cells}
+                cols = {CELL_COL[i] for i in cells}
+                if len(rows) == 1:
+                    line = [i for i in ROW_UNITS[rows.pop()] if CELL_BOX[i] != b]
+                    progress |= self.eliminate(line, 1 << d)
+                if len(cols) == 1:
+                    line = [i for i in COL_UNITS[cols.pop()] if CELL_BOX[i] != b]
+                    progress |= self.eliminate(line, 1 << d)
+        return progress
+
+    def box_line(self):
+        # A digit confined to one box inside a row/column leaves the rest of that box
+        progress = False
+        for unit in ROW_UNITS + COL_UNITS:
+            for d, where in enumerate(self._positions(unit)):
+                if where == 0: continue
+                boxes = {CELL_BOX[unit[k]] for k in range(GRID_SIZE) if where >> k & 1}
+                if len(boxes) == 1:
+                    rest = [i for i in BOX_UNITS[boxes.pop()] if i not in unit]
+                    progress |= self.eliminate(rest, 1 << d)
+        return progress
+
+    def _naked_subset(self, size):
+        cands, values = self.cands, self.values
+        progress = False
+        for unit in UNITS:
+            open_cells = [i for i in unit if values[i] == 0 and MASK_COUNT[cands[i]] <= size]
+            for group in combinations(open_cells, size):
+                union = 0
+                for i in group: union |= cands[i]
+                if MASK_COUNT[union] == size:
+                    rest = [i for i in unit if i not in group]
+                    progress |= self.eliminate(rest, union)
+        return progress
+
+    def _hidden_subset(self, size):
+        progress = False
+        for unit in UNITS:
+            pos = self._positions(unit)
+            digits = [d for d in range(GRID_SIZE) if 1 < MASK_COUNT[pos[d]] <= size]
+            for group in combinations(digits, size):
+                where = 0
+                keep = 0
+                for d in group:
+                    where |= pos[d]
+                    keep |= 1 << d
+                if MASK_COUNT[where] == size:
+                    cells = [unit[k] for k in range(GRID_SIZE) if where >> k & 1]
+                    progress |= self.eliminate(cells, FULL_MASK & ~keep)
+        return progress
+
+    def naked_pair(self): return self._naked_subset(2)
+    def hidden_pair(self): return self._hidden_subset(2)
+    def naked_triple(self): return self._naked_subset(3)
+    def hidden_triple(self): return self._hidden_subset(3)
+
+    def _fish(self, size):
+        # size base lines whose candidates for a digit cover exactly size cross lines
+        progress = False
+        for bases, covers in ((ROW_UNITS, COL_UNITS), (COL_UNITS, ROW_UNITS)):
+            for d in range(GRID_SIZE):
+                bit = 1 << d
+                lines = []
+                for b, unit in enumerate(bases):
+                    where = 0
+                    for k, i in enumerate(unit):
+                        if self.cands[i] & bit: where |= 1 << k
+                    if 1 < MASK_COUNT[where] <= size: lines.append((b, where))
+                for group in combinations(lines, size):
+                    where = 0
+                    for _, w in group: where |= w
+                    if MASK_COUNT[where] == size:
+                        base_ids = {b for b, _ in group}
+                        for k in range(GRID_SIZE):
+                            if where >> k & 1:
+                                rest = [i for n, i in enumerate(covers[k]) if n not in base_ids]
+                                progress |= self.eliminate(rest, bit)
+        return progress
+
+    def x_wing(self): return self._fish(2)
+    def swordfish(self): return self._fish(3)
+
+    def step(self):
+        """Applies the simplest technique that makes progress and returns its name, or None if stuck."""
+        for name in TECHNIQUE_SCORES:
+            if getattr(self, name)():
+                self.steps[name] = self.steps.get(name, 0) + 1
+                return name
+        return None
+
+    def run(self):
+        """Steps until the puzzle is solved, broken or beyond every known technique."""
+        while self.unsolved and not self.broken:
+            if self.step() is None: break
+        return self.unsolved == 0 and not self.broken
+
+def grade_puzzle(board):
+    """Grades a puzzle by the hardest human technique needed to solve it (9x9 only)."""
+    if len(board) != GRID_SIZE:
+        raise ValueError(f"Only {GRID_SIZE}x{GRID_SIZE} puzzles can be graded, got {len(board)}x{len(board)}")
+    solver = LogicalSolver(board)
+    with metrics.timer("grade"):
+        solved = solver.run()
+    return grade_from_steps(solver.steps, solved)
+
+def grade_from_steps(steps, solved):
+    """The GradeResult of a grader run that used each technique steps[name] times and did or did not solve the puzzle."""
+    if solved:
+        hardest = max(steps, key=TECHNIQUE_SCORES.get, default=None)
+        score = TECHNIQUE_SCORES[hardest] if hardest else 0
+    else:
+        hardest, score = None, GUESSING_SCORE
+    return GradeResult(band_for_score(score), score, hardest, solved, dict(steps))
+
+def dig_puzzle(full_board, band, cancel=None, rng=random):
+    """
+    Blanks cells of a 9x9 full board one at a time in random order, putting back any removal
+    that gives a second solution or grades past band, until BAND_BLANKS[band] cells are blank
+    and the puzzle grades into band; returns (puzzle, grade). Aiming at the band this way
+    keeps it from being overshot: an expert dig stops short of needing guesses instead of
+    landing in extreme. The grade may still fall below band when no cell is left that can go.
+    """
+    names = [name for name, _ in DIFFICULTY_BANDS]
+    target = names.index(band)
+    puzzle = [row[:] for row in full_board]
+    grade = grade_puzzle(puzzle)
+    cells = [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
+    rng.shuffle(cells)
+    removed = 0
+    with metrics.timer("create_puzzle.remove"):
+        for row, col in cells:
+            if removed >= BAND_BLANKS[band] and grade.band == band: break
+            if cancel is not None and cancel.is_set(): raise SearchCancelled()
+            num = puzzle[row][col]
+            puzzle[row][col] = 0
+            new_grade = grade_puzzle(puzzle)
+            # Logic alone solving it proves it unique; only puzzles needing guesses are counted
+            if names.index(new_grade.band) <= target and (new_grade.solved or _still_unique(puzzle)):
+                grade = new_grade
+                removed += 1
+                continue
+            puzzle[row][col] = num
+    return puzzle, grade
+
+def generate_graded_puzzle(band=DEFAULT_DIFFICULTY, max_attempts=None, timeout=None, cancel=None, rng=random):
+    """
+    Digs unique puzzles (see dig_puzzle) until one grades into band.
+    Returns (full_board, puzzle, grade); if no attempt lands in the band within
+    max_attempts (BAND_ATTEMPTS[band] by default), or within timeout seconds (checked between attempts, after the first),
+    the attempt with the closest score is returned. Raises SearchCancelled once cancel is set.
+    With a seeded rng and no timeout, the result depends on the seed alone.
+    """
+    names = [name for name, _ in DIFFICULTY_BANDS]
+    if band not in names:
+        raise ValueError(f"Unknown difficulty band {band!r}; choose from {names}")
+    target = names.index(band)
+    if max_attempts is None: max_attempts = BAND_ATTEMPTS[band]
+    deadline = None if timeout is None else time.monotonic() + timeout
+    best = None
+    for _ in range(max_attempts):
+        if best is not None and deadline is not None and time.monotonic() >= deadline: break
+        if metrics.enabled: metrics.count("generate.graded_attempts")
+        full_board = generate_full_board(cancel=cancel, rng=rng)
+        puzzle, grade = dig_puzzle(full_board, band, cancel, rng)
+        distance = abs(names.index(grade.band) - target)
+        if best is None or distance < best[0]:
+            best = (distance, full_board, puzzle, grade)
+        if distance == 0: break
+    return best[1:]
+
+# Seconds a new game may spend looking for a puzzle in its band before taking the closest one
+NEW_GAME_TIMEOUT = 2.0
+
+def make_puzzle(difficulty=DEFAULT_DIFFICULTY, bank=None, box_size=BOX_SIZE, timeout=None, cancel=None, seed=None,
+                rng=random):
+    """
+    Returns (full_board, puzzle, grade), from the bank when it holds difficulty, else freshly generated.
+    Other box sizes than 3 are generated without the bank and come back with grade None:
+    the band picks the share of cells to blank, scaled from its 9x9 blank count.
+    timeout and cancel are passed on to generate_graded_puzzle and the generators, and every
+    random choice, the bank's included, comes from rng.
+    With a seed (any int or string), the puzzle is generated from random.Random(seed_id(...))
+    instead and bank and timeout are ignored, so the same seed, difficulty and box_size always give
+    the same puzzle; see sudogen_cache for looking those up by ID.
+    """
+    if seed is not None:
+        rng = random.Random(seed_id(seed, difficulty, box_size))
+        bank = timeout = None # Both would make the result depend on more than the seed
+    with metrics.timer("make_puzzle"):
+        if box_size != BOX_SIZE:
+            if isinstance(difficulty, str):
+                if difficulty not in BAND_BLANKS:
+                    raise ValueError(f"Unknown difficulty band {difficulty!r}; choose from {list(BAND_BLANKS)}")
+                difficulty = round(BAND_BLANKS[difficulty] * box_size ** 4 / (GRID_SIZE * GRID_SIZE))
+            full_board = generate_full_board(box_size, cancel, rng)
+            return full_board, create_puzzle(full_board, difficulty, unique=True, cancel=cancel, rng=rng), None
+        if bank is not None and bank.count(difficulty) > 0:
+            return bank.random(difficulty, rng)
+        if isinstance(difficulty, str):
+            return generate_graded_puzzle(difficulty, timeout=timeout, cancel=cancel, rng=rng)
+        full_board = generate_full_board(cancel=cancel, rng=rng)
+        puzzle = create_puzzle(full_board, difficulty, unique=True, cancel=cancel, rng=rng)
+        return full_board, puzzle, grade_puzzle(puzzle)
+
+def seed_id(seed, difficulty=DEFAULT_DIFFICULTY, box_size=BOX_SIZE):
+    """
+    ID of the puzzle make_puzzle(difficulty, box_size=box_size, seed=seed) returns, such as
+    "medium:9:2026-10-18" (difficulty, grid size, seed); parse_seed_id reads it back.
+    The ID, not the seed itself, seeds the generator, so seed 7 and seed "7" are one puzzle.
+    """
+    return f"{difficulty}:{box_size * box_size}:{seed}"
+
+def parse_seed_id(text):
+    """Returns (seed, difficulty, box_size) from a seed_id string, the seed as a string; ValueError if malformed."""
+    parts = text.split(":", 2)
+    if len(parts) != 3 or not parts[2]:
+        raise ValueError(f"Expected a puzzle ID like 'medium:9:SEED', got {text!r}")
+    difficulty, size, seed = parts
+    if difficulty.isdigit():
+        difficulty = int(difficulty)
+    elif difficulty not in BAND_BLANKS:
+        raise ValueError(f"Unknown difficulty band {difficulty!r}; choose from {list(BAND_BLANKS)}")
+    box = math.isqrt(int(size)) if size.isdigit() else 0
+    if box not in BOX_SIZES or box * box != int(size):
+        raise ValueError(f"Unsupported grid size {size!r} in puzzle ID")
+    return seed, difficulty, box
+
+# One character per cell value, so bigger grids write 10..25 as A..P
+DIGIT_CHARS = "0123456789ABCDEFGHIJKLMNOP"
+_CHAR_DIGITS = {**{ch: n for n, ch in enumerate(DIGIT_CHARS)}, **{ch.lower(): n for n, ch in enumerate(DIGIT_CHARS)}, ".": 0}
+
+def board_to_string(board):
+    """Flattens a board to a string of one character per cell (81 for 9x9), 0 for blanks."""
+    return "".join(DIGIT_CHARS[num] for row in board for num in row)
+
+def string_to_board(text):
+    """Parses a board_to_string string ('0' or '.' for blanks) back into a board; its length gives the size."""
+    text = text.strip()
+    size = math.isqrt(len(text))
+    if size * size != len(text) or math.isqrt(size) ** 2 != size or math.isqrt(size) not in BOX_SIZES:
+        raise ValueError(f"Expected {GRID_SIZE * GRID_SIZE} cells (or 16, 256, 625), got {len(text)}")
+    try:
+        digits = [_CHAR_DIGITS[ch] for ch in text]
+    except KeyError as err:
+        raise ValueError(f"Unexpected cell character {err.args[0]!r}") from None
+    if max(digits) > size:
+        raise ValueError(f"Cell value {DIGIT_CHARS[max(digits)]} is too big for a {size}x{size} board")
+    return [digits[r * size:(r + 1) * size] for r in range(size)]
+
+def board_to_bytes(board):
+    """Flattens a board to bytes, one per cell row by row, as GridState keeps it."""
+    return bytes(num for row in board for num in row)
+
+def bytes_to_board(data):
+    """Turns board_to_bytes output (or any flat buffer of cell values) back into a list of rows."""
+    size = math.isqrt(len(data))
+    return [list(data[r * size:(r + 1) * size]) for r in range(size)]
+
+def _as_bytes(board):
+    """board as flat bytes: bytes are used as they are, lists of rows and other buffers are copied."""
+    if isinstance(board, bytes): return board
+    if isinstance(board, (bytearray, memoryview)): return bytes(board)
+    return board_to_bytes(board)
+
+def puzzle_id(board):
+    """Short stable ID of a puzzle: 16 hex digits of a BLAKE2b hash of its givens."""
+    return hashlib.blake2b(board_to_string(board).encode("ascii"), digest_size=8).hexdigest()
+
+# Game State
+
+# A move a person could make next: technique is a TECHNIQUE_SCORES name (the hardest one
+# needed to get there), "mistake" for correcting a wrong answer, or None when only guessing is left
+HintStep = namedtuple("HintStep", ["technique", "row", "col", "digit"])
+
+class GridState:
+    """
+    State of one game, with no GUI: the puzzle, the player's answers and the
+    running counts derived from them. The pygame Grid draws on top of this.
+
+    Boards are kept flat, one byte per cell i = r * size + c: the solution and givens as
+    bytes, which games of the same puzzle can share, the answers as a bytearray, and the
+    hinted cells as bits of an int. With __slots__ that is a few hundred bytes per 9x9
+    game. The unit counts and candidate grid behind conflicts, hints and pencil marks
+    are built the first time one of those is used. full_board, initial_board,
+    user_answers and hint_mask return the boards as lists of rows, as copies.
+    """
+    __slots__ = ("size", "box", "grade", "solution", "givens", "answers", "hints", "selected", "message",
+                 "game_over", "total_blanks", "correct_count", "filled_count", "wrong_attempts", "recorder",
+                 "_counts", "_conflicts", "_cands")
+
+    def __init__(self, difficulty=DEFAULT_DIFFICULTY, bank=None, puzzle=None, box_size=BOX_SIZE):
+        # difficulty is a band name from DIFFICULTY_BANDS, or a blank count for ungraded puzzles;
+        # puzzle is a ready (full_board, board, grade) tuple, e.g. from PuzzleProducer, with the
+        # boards as lists of rows or board_to_bytes bytes, whose size overrides box_size;
+        # grade is None for puzzles that are not 9x9
+        if puzzle is None:
+            puzzle = make_puzzle(difficulty, bank, box_size, timeout=NEW_GAME_TIMEOUT)
+        full_board, board, self.grade = puzzle
+        self.solution = _as_bytes(full_board)
+        self.givens = _as_bytes(board)
+        self.size = size = math.isqrt(len(self.givens))
+        self.box = math.isqrt(size)
+        if self.box not in BOX_SIZES or self.box ** 4 != len(self.givens) or len(self.solution) != len(self.givens):
+            raise ValueError(f"Unsupported board of {len(self.givens)} cells; expected one of {[b ** 4 for b in BOX_SIZES]}")
+        self.answers = bytearray(size * size)
+        self.hints = 0 # Bit i is set while cell i holds a hint
+        self.selected = None
+        self.message = ""
+        self.game_over = False
+        self.total_blanks = self.givens.count(0)
+        self.correct_count = 0
+        self.wrong_attempts = 0
+        self.recorder = None # Optional object whose move(kind, row, col, value) logs each input
+        # Running state kept up to date by _set_answer, so completion checks are O(1)
+        self.filled_count = size * size - self.total_blanks
+        self._counts = self._conflicts = self._cands = None # Built by _analyze when first needed
+
+    # --- Lists of rows, for callers that index [r][c]; each call builds fresh copies ---
+
+    @property
+    def full_board(self):
+        return bytes_to_board(self.solution)
+
+    @property
+    def initial_board(self):
+        return bytes_to_board(self.givens)
+
+    board = initial_board
+
+    @property
+    def user_answers(self):
+        return bytes_to_board(self.answers)
+
+    @property
+    def hint_mask(self):
+        size, hints = self.size, self.hints
+        return [[hints >> (r * size + c) & 1 for c in range(size)] for r in range(size)]
+
+    def copy(self):
+        """An independent copy of the game, without its recorder; the answers and counts are sliced, the puzzle shared."""
+        other = object.__new__(type(self))
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                setattr(other, name, getattr(self, name))
+        other.answers = self.answers[:]
+        other.recorder = None
+        if self._counts is not None:
+            other._counts = self._counts[:]
+            other._cands = self._cands[:]
+        return other
+
+    # --- Unit counts and candidates ---
+
+    def _analyze(self):
+        """Builds the unit counts, conflicts and candidate grid from the board; _set_answer keeps them current after."""
+        size = self.size
+        self._counts = bytearray(3 * size * size) # [unit * size + digit - 1], units as in _geometry
+        self._conflicts = 0
+        for i in range(size * size):
+            num = self._value(i)
+            if num: self._count(i, num, 1)
+        # Candidates (pencil marks) of every cell as bitmasks with bit d - 1 for digit d, for
+        # the board as it stands, wrong answers included. _set_answer keeps them current by
+        # visiting the peers of the changed cell (20 on 9x9), so reads cost nothing.
+        self._cands = array("H" if size <= 16 else "L", [0 if self._value(i) else self._allowed(i)
+                                                         for i in range(size * size)])
+
+    @property
+    def conflicts(self):
+        """Extra copies of a digit across all rows, columns and boxes."""
+        if self._counts is None: self._analyze()
+        return self._conflicts
+
+    @property
+    def cands(self):
+        """Candidate bitmask of every cell i (bit d - 1 for digit d); 0 for filled cells."""
+        if self._cands is None: self._analyze()
+        return self._cands
+
+    def _count(self, i, num, delta):
+        """Adds delta occurrences of num to the row, column and box counts of cell i."""
+        counts, size = self._counts, self.size
+        for u in _geometry(self.box)[2][i]:
+            k = u * size + num - 1
+            if delta > 0 and counts[k] >= 1: self._conflicts += 1
+            elif delta < 0 and counts[k] >= 2: self._conflicts -= 1
+            counts[k] += delta
+
+    def _value(self, i):
+        """Digit in cell i (r * size + c), given or answered; 0 if empty."""
+        return self.givens[i] or self.answers[i]
+
+    def _allowed(self, i):
+        """Bitmask of the digits missing from the row, column and box of cell i."""
+        counts, size = self._counts, self.size
+        row, col, box = (u * size for u in _geometry(self.box)[2][i])
+        mask = 0
+        for d in range(size):
+            if not (counts[row + d] or counts[col + d] or counts[box + d]): mask |= 1 << d
+        return mask
+
+    def _update_candidates(self, i, old, val):
+        """Brings the peers of cell i up to date after its answer changed from old to val (0 = empty)."""
+        cands, peers = self._cands, _geometry(self.box)[3][i]
+        if old:
+            # old is back in play for empty peers that no longer see it anywhere
+            bit = 1 << (old - 1)
+            for p in peers:
+                if not cands[p] & bit and self._value(p) == 0 and self._allowed(p) & bit:
+                    cands[p] |= bit
+        if val:
+            keep = ~(1 << (val - 1))
+            for p in peers:
+                cands[p] &= keep
+            cands[i] = 0
+        else:
+            cands[i] = self._allowed(i)
+
+    def _set_answer(self, r, c, val):
+        """Writes val (0 to clear) to a user cell and updates the running counts."""
+        i = r * self.size + c
+        old = self.answers[i]
+        if old == val: return
+        solution = self.solution[i]
+        if old != 0:
+            self.filled_count -= 1
+            if old == solution: self.correct_count -= 1
+        self.answers[i] = val
+        if val != 0:
+            self.filled_count += 1
+            if val == solution: self.correct_count += 1
+        if self._counts is not None:
+            if old != 0: self._count(i, old, -1)
+            if val != 0: self._count(i, val, 1)
+            self._update_candidates(i, old, val)
+
+    def select_cell(self, row, col):
+        """Selects (row, col) if it is a blank of the puzzle, otherwise clears the selection."""
+        if self.givens[row * self.size + col] == 0:
+            self.selected = (row, col)
+        else:
+            self.selected = None
+
+    def place_number(self, val):
+        """Places a number in the selected cell and checks for correctness/game over condition."""
+        if self.selected is None or self.game_over: return False
+        r, c = self.selected
+        i = r * self.size + c
+        solution = self.solution[i]
+        
+        # Check if the cell was already correctly solved by the user (to avoid double counting)
+        was_correct = self.answers[i] == solution
+
+        self.hints &= ~(1 << i) # Not a hint if the user enters it
+        self._set_answer(r, c, val)
+        if self.recorder: self.recorder.move("place", r, c, val)
+        
+        if val != solution:
+            # Only increment wrong attempts if it was previously empty or wrong, and the new value is wrong
+            if not was_correct:
+                self.wrong_attempts += 1
+            
+            if self.wrong_attempts >= MAX_WRONG:
+                self.message = f"Oops! Too many wrong attempts ({self.wrong_attempts}/{MAX_WRONG})!"
+                self.game_over = True
+            else:
+                self.message = f"Wrong attempt {self.wrong_attempts}/{MAX_WRONG}"
+            return True
+            
+        self.message = ""
+        self.check_completion()
+        return True
+
+    def delete_number(self):
+        """Clears the number in the selected cell."""
+        if self.selected and not self.game_over:
+            r, c = self.selected
+            self._set_answer(r, c, 0)
+            self.hints &= ~(1 << (r * self.size + c))
+            if self.recorder: self.recorder.move("delete", r, c, 0)
+            self.check_completion()
+
+    def calculate_correct_count(self):
+        """Recounts from scratch how many user-entered (non-initial) cells match the solution (correct_count is kept incrementally)."""
+        givens, solution = self.givens, self.solution
+        return sum(1 for i, user_val in enumerate(self.answers)
+                   if user_val != 0 and givens[i] == 0 and user_val == solution[i])
+
+    def check_completion(self):
+        """Checks if the puzzle is fully and correctly solved."""
+        # Check if the whole board is filled (initial + user answers)
+        is_filled = self.filled_count == self.size * self.size
+
+        if is_filled:
+            # The puzzle is considered solved if the number of correct user answers
+            # equals the total number of blanks.
+            if self.correct_count == self.total_blanks:
+                self.message = "SOLVED! Press 'R' for a new game."
+                self.game_over = True
+            else:
+                self.message = "Board filled, but errors remain."
+                self.game_over = False
+                
+        elif self.correct_count < self.total_blanks:
+            self.message = f"Keep going! ({self.correct_count}/{self.total_blanks})"
+            self.game_over = False
+        else:
+            self.message = ""
+
+    def candidates(self, r, c):
+        """Digits that can still go in (r, c) as the board stands; empty for filled cells."""
+        mask = self.cands[r * self.size + c]
+        return [d + 1 for d in range(self.size) if mask >> d & 1]
+
+    def _single(self, i):
+        """(technique, digit) if cell i is a hidden or naked single on the candidate grid, else None."""
+        cands = self.cands
+        m = cands[i]
+        if m == 0: return None
+        _, units, cell_units, _ = _geometry(self.box)
+        for u in cell_units[i]:
+            others = 0
+            for j in units[u]:
+                if j != i: others |= cands[j]
+            only = m & ~others
+            if only and only & (only - 1) == 0:
+                return "hidden_single", only.bit_length()
+        if m & (m - 1) == 0:
+            return "naked_single", m.bit_length()
+        return None
+
+    def next_step(self):
+        """
+        The next move a person could make, as a HintStep, or None if the board is full.
+        A wrong answer comes first; then any single on the candidate grid, the selected
+        cell before the others; then, on 9x9, LogicalSolver's harder techniques up to the
+        next cell they fill. Failing all of those, the selected (or most constrained) empty
+        cell is given with technique None.
+        """
+        size = self.size
+        order = list(range(size * size))
+        if self.selected is not None:
+            first = self.selected[0] * size + self.selected[1]
+            order.remove(first)
+            order.insert(0, first)
+        answers, solution = self.answers, self.solution
+        if self.filled_count - (size * size - self.total_blanks) > self.correct_count:
+            for i in order:
+                if answers[i] and answers[i] != solution[i]:
+                    return HintStep("mistake", i // size, i % size, solution[i])
+        empty = [i for i in order if self._value(i) == 0]
+        if not empty: return None
+        for i in empty:
+            single = self._single(i)
+            if single is not None:
+                return HintStep(single[0], i // size, i % size, single[1])
+        if size == GRID_SIZE:
+            # No singles: eliminations are needed first, which the grader's solver knows
+            solver = LogicalSolver([[self._value(r * size + c) for c in range(size)] for r in range(size)])
+            used = []
+            while not solver.broken:
+                unsolved = solver.unsolved
+                technique = solver.step()
+                if technique is None: break
+                used.append(technique)
+                if solver.unsolved < unsolved:
+                    i = next(i for i in empty if solver.values[i])
+                    return HintStep(max(used, key=TECHNIQUE_SCORES.get), i // size, i % size, solver.values[i])
+        i = min(empty, key=lambda i: bin(self.cands[i]).count("1"))
+        return HintStep(None, i // size, i % size, solution[i])
+
+    def hint(self):
+        """Fills in the next logical step (see next_step), selects its cell and names the technique."""
+        if self.game_over: return False
+        step = self.next_step()
+        if step is None: return False
+        r, c = step.row, step.col
+        num = self.solution[r * self.size + c]
+        self.selected = (r, c)
+        self._set_answer(r, c, num)
+        self.hints |= 1 << (r * self.size + c) # Mark as hint used
+        if self.recorder: self.recorder.move("hint", r, c, num)
+        self.check_completion()
+        if self.game_over: return True # Keep the SOLVED message
+        cell = f"R{r + 1}C{c + 1}"
+        if step.technique == "mistake":
+            self.message = f"Hint: {cell} was wrong, it is {DIGIT_CHARS[num]}. ({self.correct_count}/{self.total_blanks})"
+        elif step.technique is None:
+            self.message = f"Hint: {DIGIT_CHARS[num]} at {cell} (no logical step left, a guess)"
+        else:
+            self.message = (f"Hint ({step.technique.replace('_', ' ')}): {DIGIT_CHARS[num]} at {cell}. "
+                            f"({self.correct_count}/{self.total_blanks})")
+        return True
+
+    def solve_board(self):
+        """Fills the entire board with the solution."""
+        if not self.game_over:
+            for i, given in enumerate(self.givens):
+                if given == 0:
+                    self._set_answer(i // self.size, i % self.size, self.solution[i])
+                    self.hints |= 1 << i
+            if self.recorder: self.recorder.move("solve", 0, 0, 0)
+            self.message = "Board solved by computer. Press R for a new game."
+            self.game_over = True
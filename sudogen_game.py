@@ -0,0 +1,397 @@
+"""Pygame board, rendering and game loop."""
+import math
+import time
+
+import pygame
+
+from sudogen_core import BOX_SIZE, DIGIT_CHARS, GRID_SIZE, MAX_WRONG, DEFAULT_DIFFICULTY, GridState, seed_id
+from sudogen_batch import PuzzleProducer
+from sudogen_server import PUZZLE_SERVER_URL, PuzzleClient
+from sudogen_sessions import SessionRecorder
+from sudogen_storage import open_bank
+import sudogen_metrics as metrics
+
+# Pygame Sudoku Constants
+WIDTH=540
+HEIGHT=600
+SQUARE_SIZE=WIDTH // GRID_SIZE # For 9x9; other grids use square_size(size)
+FPS=60
+COUNTDOWN_REFRESH_MS = 100 # Redraw interval while only the solve countdown is changing
+
+# Pygame Sudoku Colors
+WHITE=(255, 255, 255)
+BLACK=(0, 0, 0)
+LIGHT_PURPLE = (70, 0, 100) # Dark purple for background
+GRAY=(200, 200, 200)
+BLUE=(0, 150, 255) # Selection color
+RED=(255, 100, 100) # Wrong attempt color
+GREEN=(100, 255, 100)
+HINT_COLOR=(255, 200, 50) # Gold/Yellow for user-entered numbers for better contrast/distinction
+MARK_COLOR=(190, 160, 215) # Pencil marks, dimmer than the digits
+PENCIL_MARK_MAX_SIZE = GRID_SIZE # Bigger grids leave no room in a cell for its candidates
+
+# --- Pygame Rendering Helpers ---
+
+_GLYPHS = {} # (font, text, color) -> pre-rendered surface
+
+def render_glyph(font, text, color):
+    """Returns a cached antialiased rendering of text; digits only ever need a handful of these."""
+    key = (font, text, color)
+    surface = _GLYPHS.get(key)
+    if surface is None:
+        surface = _GLYPHS[key] = font.render(text, True, color)
+    return surface
+
+def square_size(size):
+    """Side in pixels of one cell of a size x size grid; the grid is square_size(size) * size wide."""
+    return WIDTH // size
+
+def key_digit(event, size):
+    """The value 1..size typed by a KEYDOWN event (A for 10, B for 11, ... on big grids), or 0."""
+    text = event.unicode or pygame.key.name(event.key) # unicode can be empty, e.g. for synthetic events
+    value = DIGIT_CHARS.find(text.upper()) if len(text) == 1 else -1
+    return value if 1 <= value <= size else 0
+
+_MARK_FONTS = {} # Grid size -> font for pencil marks
+
+def mark_font(size):
+    """Font for the pencil marks of a size x size grid, box digits to a cell side."""
+    font = _MARK_FONTS.get(size)
+    if font is None:
+        font = _MARK_FONTS[size] = pygame.font.SysFont("Inter", square_size(size) // math.isqrt(size))
+    return font
+
+def draw_marks(screen, mask, x, y, size):
+    """Draws the candidates in bitmask mask as a box x box block of small digits in the cell at (x, y)."""
+    box = math.isqrt(size)
+    sub = square_size(size) // box
+    font = mark_font(size)
+    for d in range(size):
+        if mask >> d & 1:
+            glyph = render_glyph(font, DIGIT_CHARS[d + 1], MARK_COLOR)
+            screen.blit(glyph, (x + d % box * sub + (sub - glyph.get_width()) // 2,
+                                y + d // box * sub + (sub - glyph.get_height()) // 2))
+
+def draw_grid_lines(screen, size=GRID_SIZE):
+    """Draws the Sudoku grid lines."""
+    box = math.isqrt(size)
+    square = square_size(size)
+    for i in range(size + 1):
+        thickness = 3 if i % box == 0 else 1
+        # Draw grid lines over the dark background
+        pygame.draw.line(screen, WHITE, (0, i * square), (square * size, i * square), thickness)
+        pygame.draw.line(screen, WHITE, (i * square, 0), (i * square, square * size), thickness)
+
+#Pygame Grid Class
+class Grid(GridState):
+    """GridState plus the pygame drawing and mouse selection for it."""
+    __slots__ = ("pencil_marks",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pencil_marks = False # Show each empty cell's candidates; see toggle_pencil_marks
+
+    def toggle_pencil_marks(self):
+        """Turns the automatic pencil marks on or off; returns the new setting."""
+        if self.size > PENCIL_MARK_MAX_SIZE:
+            self.message = "Pencil marks are only shown on 9x9 and smaller grids."
+            return False
+        self.pencil_marks = not self.pencil_marks
+        return self.pencil_marks
+
+    def cell_appearance(self, r, c):
+        """
+        Returns (digit, color, selected, marks) describing how cell (r, c) is drawn; digit 0
+        means empty, and marks is the bitmask of pencil marks shown in it (0 for none).
+        """
+        selected = self.selected == (r, c)
+        i = r * self.size + c
+        if self.givens[i] != 0:
+            return self.givens[i], WHITE, selected, 0
+        num = self.answers[i]
+        if num == 0:
+            return 0, None, selected, self.cands[i] if self.pencil_marks else 0
+        if not self.game_over and num != self.solution[i]:
+            return num, RED, selected, 0
+        return num, HINT_COLOR, selected, 0
+
+    def select(self, pos):
+        """Sets the selected cell based on mouse click position."""
+        square = square_size(self.size)
+        if pos[0] >= square * self.size or pos[1] >= square * self.size:
+            self.selected = None
+            return
+        col = pos[0] // square
+        row = pos[1] // square
+        self.select_cell(row, col)
+
+
+def draw_info_panel(screen, grid, FONT_PG, SMALL_FONT_PG):
+    """
+    Draws the instruction, message, and score panel at the bottom.
+    """
+    panel_y = WIDTH
+    panel_height = HEIGHT - WIDTH
+    pygame.draw.rect(screen, GRAY, (0, panel_y, WIDTH, panel_height))
+
+    #Line 1: Score and Help
+    score_text = "Correct: {}/{}".format(grid.correct_count, grid.total_blanks)
+    score_surface = SMALL_FONT_PG.render(score_text, True, BLACK)
+    line1_y = panel_y + 4
+    screen.blit(score_surface, (10, line1_y))
+
+    # H is the digit 17 on a 25x25 grid, so F1 (or ?) asks for a hint there
+    marks_text = "P: Marks | " if grid.size <= PENCIL_MARK_MAX_SIZE else ""
+    help_text = f"{'H' if grid.size < 17 else 'F1'}: Hint | {marks_text}R: New Game | S: Solve"
+    help_surface = SMALL_FONT_PG.render(help_text, True, BLACK)
+    screen.blit(help_surface, (WIDTH - help_surface.get_width() - 10, line1_y))
+    
+    #Line 2: Attempts (Shifted down)
+    attempts_text = f"Attempts: {grid.wrong_attempts}/{MAX_WRONG}"
+    attempts_surface = SMALL_FONT_PG.render(attempts_text, True, BLACK)
+    line2_y = panel_y + 20
+    screen.blit(attempts_surface, (10, line2_y))
+
+
+    #Line 3: Message/Instructions
+    message_text = grid.message
+    if not message_text and not grid.game_over:
+        message_text = f"Click a cell, enter 1-{DIGIT_CHARS[grid.size]}. DEL/BACKSPACE to clear."
+
+    text_surface = SMALL_FONT_PG.render(message_text, True, BLACK)
+    text_x = (WIDTH - text_surface.get_width()) // 2
+    line3_y = panel_y + 40
+    text_y = line3_y - (text_surface.get_height() // 2)
+
+    screen.blit(text_surface, (text_x, text_y))
+
+
+class BoardRenderer:
+    """
+    Draws a Grid onto the screen incrementally. The background and grid lines are
+    pre-rendered once; each frame only cells whose appearance changed and the info
+    panel (when its text changed) are redrawn, and their rects are returned for
+    pygame.display.update.
+    """
+    def __init__(self, screen, font, small_font, size=GRID_SIZE):
+        self.screen = screen
+        self.font = font
+        self.small_font = small_font
+        self.size = size
+        self.square = square_size(size)
+        self.background = pygame.Surface((WIDTH, HEIGHT))
+        self.background.fill(LIGHT_PURPLE)
+        # Grid lines on their own layer so they can be laid back over a redrawn cell, as in a full frame
+        self.lines = pygame.Surface((WIDTH, WIDTH))
+        self.lines.fill(BLACK)
+        self.lines.set_colorkey(BLACK)
+        draw_grid_lines(self.lines, size)
+        self.background.blit(self.lines, (0, 0))
+        self.invalidate()
+
+    def invalidate(self):
+        """Forces a full redraw on the next frame (e.g. after the window was covered)."""
+        self.cells = {}
+        self.panel = None
+        self.full = True
+
+    def draw_cell(self, grid, r, c, appearance):
+        num, color, selected, marks = appearance
+        square = self.square
+        rect = pygame.Rect(c * square, r * square, square, square)
+        self.screen.blit(self.background, rect, rect)
+        if selected:
+            pygame.draw.rect(self.screen, BLUE, rect, 3)
+        if num:
+            glyph = render_glyph(self.font, DIGIT_CHARS[num], color)
+            self.screen.blit(glyph, (rect.x + (square - glyph.get_width()) // 2,
+                                     rect.y + (square - glyph.get_height()) // 2))
+        elif marks:
+            draw_marks(self.screen, marks, rect.x, rect.y, self.size)
+        self.screen.blit(self.lines, rect, rect)
+        return rect
+
+    def draw(self, grid):
+        """Redraws whatever changed since the last call and returns the dirty rects."""
+        dirty = []
+        if self.full:
+            self.screen.blit(self.background, (0, 0))
+            dirty.append(self.screen.get_rect())
+        for r in range(self.size):
+            for c in range(self.size):
+                appearance = grid.cell_appearance(r, c)
+                if self.cells.get((r, c)) != appearance:
+                    self.cells[(r, c)] = appearance
+                    rect = self.draw_cell(grid, r, c, appearance)
+                    if not self.full: dirty.append(rect)
+        panel = (grid.correct_count, grid.total_blanks, grid.wrong_attempts, grid.message, grid.game_over)
+        if panel != self.panel:
+            self.panel = panel
+            draw_info_panel(self.screen, grid, self.font, self.small_font)
+            if not self.full: dirty.append(pygame.Rect(0, WIDTH, WIDTH, HEIGHT - WIDTH))
+        self.full = False
+        return dirty
+
+
+def sudoku_main(tk_root, username=None, session_writer=None, box_size=BOX_SIZE, seed=None):
+    """
+    The main Sudoku game loop. It hides Tkinter, runs Pygame, and restores Tkinter on exit.
+    Includes a 15-second delay after a successful solve.
+    With a username and a SessionWriter, every game and move is logged for that user.
+    With SUDOGEN_SERVER set to a puzzle server's URL, puzzles come from that server.
+    box_size picks the grid: 3 for 9x9, 2 for 4x4, 4 for 16x16, 5 for 25x25.
+    With a seed (such as sudogen_cache.daily_seed()), the first game is that seeded puzzle.
+    """
+    size = box_size * box_size
+    # Start pre-generating while Pygame sets up the window
+    bank = None # None when no bank has been built, or puzzles come from a server
+    if PUZZLE_SERVER_URL:
+        producer = PuzzleClient(PUZZLE_SERVER_URL, box_size=box_size)
+    else:
+        if box_size == BOX_SIZE: bank = open_bank()
+        producer = PuzzleProducer((DEFAULT_DIFFICULTY,), bank=bank, box_size=box_size)
+
+    #Pygame Setup
+    pygame.init()
+    SCREEN=pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("SUDO-GEN: Sudoku Generator & Checker")
+    FONT_PG=pygame.font.SysFont("Inter", square_size(size) * 2 // 3) # 40 on 9x9
+    SMALL_FONT_PG=pygame.font.SysFont("Times New Roman", 16)
+    CLOCK=pygame.time.Clock()
+
+    # Show something while the first puzzle finishes
+    SCREEN.fill(LIGHT_PURPLE)
+    loading_surface = SMALL_FONT_PG.render("Generating puzzle...", True, WHITE)
+    SCREEN.blit(loading_surface, ((WIDTH - loading_surface.get_width()) // 2, HEIGHT // 2))
+    pygame.display.flip()
+
+    def new_grid(puzzle, seed_key=None):
+        grid = Grid(puzzle=puzzle)
+        grid.pencil_marks = pencil_marks # Carried over from the last game
+        if session_writer is not None and username:
+            SessionRecorder(session_writer, username, grid, DEFAULT_DIFFICULTY, seed_key) # Attaches as grid.recorder
+        return grid
+
+    def finish_recording(grid):
+        if grid.recorder is not None:
+            grid.recorder.finish()
+
+    pencil_marks = False
+    if seed is not None:
+        key = seed_id(seed, DEFAULT_DIFFICULTY, box_size)
+        current_grid = new_grid(producer.seeded(key), key)
+        current_grid.message = f"Puzzle {seed}"
+    else:
+        current_grid = new_grid(producer.get(DEFAULT_DIFFICULTY, timeout=5))
+    renderer = BoardRenderer(SCREEN, FONT_PG, SMALL_FONT_PG, size)
+    # Mouse motion is never used; blocking it keeps the idle wait asleep
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
+    EXPOSE_EVENTS = {pygame.VIDEOEXPOSE, getattr(pygame, "WINDOWEXPOSED", pygame.VIDEOEXPOSE)}
+    running = True
+    game_result_message = "Game exited."
+    
+    # Delay closing sudoku screen
+    delay_start_time = 0 
+    SOLVE_DELAY_MS = 15000 # 15 seconds delay for successful solve
+
+    # Hide Tkinter root window
+    tk_root.withdraw()
+
+    while running:
+        
+        # --- Check for Delay Completion (Runs every frame) ---
+        if delay_start_time > 0:
+            elapsed_time = pygame.time.get_ticks() - delay_start_time
+            if elapsed_time >= SOLVE_DELAY_MS:
+                running = False
+                break
+            # Update the message to show the countdown
+            remaining = (SOLVE_DELAY_MS - elapsed_time) / 1000.0
+            current_grid.message = f"SOLVED! Closing in {remaining:.1f}s..."
+
+
+        # --- Event Handling ---
+        events = pygame.event.get()
+        if not events:
+            # Idle: sleep until something happens (or the countdown needs a refresh) instead of spinning at FPS
+            event = pygame.event.wait(COUNTDOWN_REFRESH_MS if delay_start_time > 0 else 0)
+            if event.type != pygame.NOEVENT: events = [event]
+        # Frame timing starts once events are in hand, so idle waiting is not counted
+        profiling = metrics.enabled
+        if profiling: frame_start = time.perf_counter()
+        for event in events:
+            if event.type in EXPOSE_EVENTS:
+                renderer.invalidate()
+            if event.type == pygame.QUIT:
+                running = False
+                break
+
+            # 'R' (New Game) is always allowed, even when game is over
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                finish_recording(current_grid) # Abandoned, unless it was already finished
+                current_grid = new_grid(producer.get(DEFAULT_DIFFICULTY))
+                delay_start_time = 0 # Reset delay state
+                continue
+            
+            # Input is only processed if the game is NOT over and NOT in the delay phase
+            if not current_grid.game_over and delay_start_time == 0:
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    pos = pygame.mouse.get_pos()
+                    current_grid.select(pos)
+                    current_grid.check_completion()
+
+                if event.type == pygame.KEYDOWN:
+                    val = key_digit(event, size)
+
+                    if val != 0:
+                        current_grid.place_number(val)
+                    elif event.key == pygame.K_DELETE or event.key == pygame.K_BACKSPACE:
+                        current_grid.delete_number()
+                    elif event.key in (pygame.K_h, pygame.K_F1) or event.unicode == "?":
+                        current_grid.hint()
+                    elif event.key == pygame.K_p:
+                        pencil_marks = current_grid.toggle_pencil_marks()
+                    elif event.key == pygame.K_s:
+                        current_grid.solve_board()
+                    
+        
+        # --- Game Over State Transition ---
+        # If the grid is now solved (and not already in delay mode):
+        if current_grid.game_over and delay_start_time == 0:
+            finish_recording(current_grid)
+            if current_grid.correct_count == current_grid.total_blanks and current_grid.wrong_attempts < MAX_WRONG:
+                game_result_message = "Sudoku completed! 🎉"
+                # Start the 15 second delay for a successful solve
+                delay_start_time = pygame.time.get_ticks()
+            else:
+                # Game over from too many wrong attempts or manual solve (no delay needed)
+                game_result_message = "Game Over. " + current_grid.message
+                running = False
+                break
+
+        # --- Drawing (changed cells and panel only) ---
+        if profiling: events_done = time.perf_counter()
+        dirty_rects = renderer.draw(current_grid)
+        if profiling: draw_done = time.perf_counter()
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+        if profiling:
+            flip_done = time.perf_counter()
+            metrics.record("frame.events", events_done - frame_start)
+            metrics.record("frame.draw", draw_done - events_done)
+            metrics.record("frame.flip", flip_done - draw_done)
+            metrics.record("frame.total", flip_done - frame_start)
+        CLOCK.tick(FPS)
+
+    # 2. Pygame Shutdown and Tkinter Restore
+    finish_recording(current_grid)
+    producer.close()
+    pygame.quit()
+    if bank is not None: bank.close()
+    
+    # Show completion messagebox
+    from tkinter import messagebox
+    messagebox.showinfo("Sudoku Session Complete", game_result_message)
+    
+    # Restore the Tkinter window
+    tk_root.deiconify()
@@ -0,0 +1,189 @@
+"""
+Load generator for the puzzle server: concurrent keep-alive clients, each sending its
+next request as soon as the last one is answered, then throughput and latency percentiles.
+
+    python SudoGenProject.py serve &
+    python SudoGenProject.py loadgen -c 64 -n 5000
+    python SudoGenProject.py loadgen --spawn -c 64 --duration 20 -o load.json
+
+--spawn starts a server of its own on a free port, waits for its pools to fill and
+stops it afterwards. 503 responses (pool empty under overload) are counted as refused,
+and the latency percentiles cover the requests that were answered with 200.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+from sudogen_bench import percentile
+from sudogen_server import SERVER_HOST, SERVER_PORT
+
+DEFAULT_PATHS = ("/puzzle?difficulty=medium",)
+SPAWN_READY_TIMEOUT = 120.0 # Seconds to wait for a spawned server's pools to fill
+
+
+async def _read_response(reader):
+    """Reads one HTTP response; returns (status, keep_alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    status = int(status_line.split()[1])
+    length = 0
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""): break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length": length = int(value)
+        elif name == "connection": keep_alive = value.strip().lower() != "close"
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def _client(host, port, paths, offset, state):
+    """One connection sending requests back to back until the run's count or deadline is reached."""
+    reader = writer = None
+    k = offset
+    try:
+        while state["remaining"] > 0 and time.perf_counter() < state["deadline"]:
+            state["remaining"] -= 1
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            path = paths[k % len(paths)]
+            k += 1
+            start = time.perf_counter()
+            try:
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n\r\n".encode("latin-1"))
+                status, keep_alive = await _read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                state["errors"] += 1
+                writer.close()
+                reader = writer = None
+                continue
+            elapsed = time.perf_counter() - start
+            state["statuses"][status] = state["statuses"].get(status, 0) + 1
+            if status == 200:
+                state["latencies"].append(elapsed)
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+    finally:
+        if writer is not None: writer.close()
+
+
+async def run_load(host, port, paths=DEFAULT_PATHS, concurrency=32, requests=None, duration=None):
+    """
+    Runs concurrency clients against the server until requests have been sent or
+    duration seconds have passed (whichever is given; both may be), and returns the
+    summary: counts per status, throughput and latency percentiles in milliseconds.
+    """
+    state = {"remaining": requests if requests is not None else float("inf"),
+             "deadline": time.perf_counter() + duration if duration is not None else float("inf"),
+             "statuses": {}, "latencies": [], "errors": 0}
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, paths, i, state) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(state["latencies"])
+    answered = sum(state["statuses"].values())
+    summary = {
+        "concurrency": concurrency,
+        "paths": list(paths),
+        "elapsed_s": elapsed,
+        "requests": answered + state["errors"],
+        "ok": state["statuses"].get(200, 0),
+        "refused": state["statuses"].get(503, 0),
+        "errors": state["errors"],
+        "statuses": {str(status): n for status, n in sorted(state["statuses"].items())},
+        "throughput_rps": state["statuses"].get(200, 0) / elapsed if elapsed else 0.0,
+    }
+    if latencies:
+        summary["latency_ms"] = {"mean": sum(latencies) / len(latencies) * 1000, "max": latencies[-1] * 1000,
+                                 **{f"p{pct}": percentile(latencies, pct) * 1000 for pct in (50, 90, 99)}}
+    return summary
+
+
+def _free_port(host):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def _get_json(url, timeout=2.0):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.load(response)
+
+
+def spawn_server(host, server_args):
+    """Starts `SudoGenProject.py serve` on a free port and waits until its pools are full; returns (process, port)."""
+    port = _free_port(host)
+    entry = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SudoGenProject.py")
+    process = subprocess.Popen([sys.executable, entry, "serve", "--host", host, "--port", str(port), *server_args])
+    deadline = time.monotonic() + SPAWN_READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            pools = _get_json(f"http://{host}:{port}/stats")["pools"]
+            if pools and all(pool["ready"] >= pool["capacity"] for pool in pools.values()):
+                return process, port
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("server did not fill its pools in time")
+
+
+def _print_summary(summary):
+    print(f"{summary['requests']} requests in {summary['elapsed_s']:.2f}s with {summary['concurrency']} clients: "
+          f"{summary['throughput_rps']:.1f} OK/s, {summary['refused']} refused (503), {summary['errors']} errors")
+    latency = summary.get("latency_ms")
+    if latency:
+        print(f"latency  p50 {latency['p50']:.2f} ms  p90 {latency['p90']:.2f} ms  p99 {latency['p99']:.2f} ms  "
+              f"max {latency['max']:.2f} ms")
+
+
+def loadgen_main(argv):
+    """Command line entry point: python SudoGenProject.py loadgen [options]."""
+    parser = argparse.ArgumentParser(prog="SudoGenProject.py loadgen",
+                                     description="Measure the puzzle server's throughput and latency under concurrent load.")
+    parser.add_argument("--url", default=f"http://{SERVER_HOST}:{SERVER_PORT}",
+                        help="server to load (default: %(default)s)")
+    parser.add_argument("-c", "--concurrency", type=int, default=32, help="concurrent clients (default: %(default)s)")
+    parser.add_argument("-n", "--requests", type=int, default=None, help="total requests to send")
+    parser.add_argument("--duration", type=float, default=None, help="seconds to run for")
+    parser.add_argument("-p", "--path", action="append",
+                        help="request path, repeatable to mix endpoints (default: %s)" % DEFAULT_PATHS[0])
+    parser.add_argument("-o", "--output", help="write the summary as JSON to this file")
+    parser.add_argument("--spawn", action="store_true", help="start a server for the run and stop it afterwards")
+    parser.add_argument("--server-arg", action="append", default=[], metavar="ARG",
+                        help="extra argument for the spawned server, e.g. --server-arg=--pool-size=500")
+    args = parser.parse_args(argv)
+    if args.requests is None and args.duration is None:
+        args.requests = 2000
+
+    url = urlsplit(args.url)
+    host, port = url.hostname or SERVER_HOST, url.port or SERVER_PORT
+    process = None
+    if args.spawn:
+        process, port = spawn_server(host, args.server_arg)
+    try:
+        summary = asyncio.run(run_load(host, port, tuple(args.path or DEFAULT_PATHS), args.concurrency,
+                                       args.requests, args.duration))
+        summary["server"] = _get_json(f"http://{host}:{port}/stats")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    _print_summary(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+            f.write("\n")
+    return 0
@@ -0,0 +1,315 @@
+"""Tkinter login window, account creation and the post-login launch page."""
+from tkinter import *
+from tkinter import messagebox
+from concurrent.futures import ThreadPoolExecutor
+
+from sudogen_storage import STORAGE_BACKEND, StorageError, check_login, create_user, open_storage
+from sudogen_sessions import SessionWriter
+
+DB_WORKERS = 2
+DB_POLL_MS = 20 # How often the Tk loop checks for a finished database task
+
+# Login window, its entry fields and button, the account storage, the worker threads
+# that query it and the game history writer; created by run_login()
+root = None
+usr = None
+pas = None
+login_btn = None
+db_store = None
+db_connected = False
+db_executor = None
+session_writer = None
+
+
+def run_db_task(on_done, work, *args):
+    """
+    Runs work(*args) on a database worker thread and calls on_done(result, error) back on
+    the Tk thread once it finishes, so slow queries and password hashing never freeze the
+    window. error is the StorageError that was raised, or None.
+
+    Tk widgets may only be touched from the thread running mainloop, so the result is
+    collected by polling the future with root.after rather than from the worker.
+    """
+    future = db_executor.submit(work, *args)
+
+    def poll():
+        if not future.done():
+            root.after(DB_POLL_MS, poll)
+            return
+        try:
+            result = future.result()
+        except StorageError as err:
+            on_done(None, err)
+        else:
+            on_done(result, None)
+
+    root.after(DB_POLL_MS, poll)
+
+
+def logout(tk_window):
+    """Destroys the current window and brings back the login screen."""
+    tk_window.destroy()
+    root.deiconify()
+
+def sudoku_launch_page(u):
+    """
+    The new post-login home page.
+    """
+    # Use Toplevel to create a new window
+    sudoku_home = Toplevel(root)
+    sudoku_home.title('SUDO-GEN - Launch Pad')
+    sudoku_home.geometry('500x400')
+    # Swapped purple3 to purple4 -> purple4 to purple3
+    sudoku_home.configure(bg='purple4')
+    root.withdraw() # Hide the main login window
+
+    # Menubar setup
+    menubar = Menu(sudoku_home)
+    sudoku_home.config(menu=menubar)
+    
+    # Game Menu
+    game_menu = Menu(menubar, tearoff=0)
+    game_menu.add_command(label='🚀 Launch Sudoku', command=lambda: start_game_sudoku(sudoku_home, u))
+    game_menu.add_command(label='📅 Daily Puzzle', command=lambda: start_game_sudoku(sudoku_home, u, daily=True))
+    game_menu.add_separator()
+    for box_size in (2, 4, 5): # The other grid sizes, ungraded
+        game_menu.add_command(label=f'🧩 {box_size * box_size}x{box_size * box_size} Sudoku',
+                              command=lambda box_size=box_size: start_game_sudoku(sudoku_home, u, box_size))
+    menubar.add_cascade(label='🔢 Game', menu=game_menu)
+    
+    # Account Menu
+    acc_menu = Menu(menubar, tearoff=0)
+    acc_menu.add_command(label=f'👤 Logged in as: {u}', command=None)
+    acc_menu.add_command(label='🔑 Logout', command=lambda: logout(sudoku_home))
+    menubar.add_cascade(label='👤 User', menu=acc_menu)
+    
+    menubar.add_command(label='❌ Exit', command=root.destroy)
+
+
+    # Center Frame for the button
+    center_frame = Frame(sudoku_home, bg='purple4', padx=20, pady=20)
+    center_frame.pack(expand=True, fill=BOTH)
+
+    wel = Label(center_frame, text = f"Welcome, {u}!\nReady to generate and solve Sudoku?", foreground='white')
+    # Swapped purple3 to purple4 -> purple4 to purple3
+    wel.configure(bg='purple4')
+    wel.config(font=('Times New Roman',18,'bold'), justify=CENTER)
+    wel.pack(pady=30)
+
+    # The main button to launch Pygame
+    start_btn = Button(center_frame,
+                        text="START SUDOKU",
+                        command=lambda: start_game_sudoku(sudoku_home, u),
+                        fg='white',
+                        bg='purple3',
+                        activebackground='purple',
+                        activeforeground='white',
+                        font=('Times New Roman', 12, 'bold'),
+                        width=15,
+                        height=1)
+    start_btn.pack(pady=20)
+
+
+def homeopen():
+    """Handles login and redirects to the Sudoku launch page on success."""
+    if not db_connected:
+        messagebox.showerror("Feature Disabled", "Database is not connected. Cannot log in.")
+        return
+
+    u = usr.get()
+    p = pas.get()
+    login_btn.config(state=DISABLED, text="Checking...")
+    run_db_task(lambda ok, err: login_checked(u, ok, err), check_login, db_store, u, p)
+
+
+def login_checked(u, login_successful, err):
+    """Finishes homeopen once the credentials have been checked in the background."""
+    login_btn.config(state=NORMAL, text="Enter")
+    if err is not None:
+        messagebox.showerror("Database Error", f"Could not check credentials: {err}")
+        return
+
+    if login_successful:
+        messagebox.showinfo("LOGIN SUCCESSFUL",'Login Successful')
+        # Clear fields
+        usr.delete(0, END)
+        pas.delete(0, END)
+        sudoku_launch_page(u) # Go to the new minimalist home page
+    else:
+        messagebox.showinfo('LOGIN FAILED','Login Failed: Invalid credentials')
+
+
+def start_game_sudoku(tk_home_window, u, box_size=3, daily=False):
+    """
+    Bridge function: hides Tkinter window and starts the Sudoku game (9x9 unless box_size says otherwise), logged for user u.
+    With daily=True the first game is today's puzzle, the same for every player.
+    """
+    from sudogen_game import sudoku_main # pygame is only loaded once a game is started
+    from sudogen_cache import daily_seed
+    tk_home_window.withdraw() # Hide the Tkinter window
+    sudoku_main(tk_home_window, u, session_writer, box_size, seed=daily_seed() if daily else None)
+
+
+# New Account Page
+def cracc(prev_window=None):
+    if not db_connected:
+        messagebox.showerror("Feature Disabled", "Database is not connected. Cannot create account.")
+        return
+    
+    if prev_window:
+        prev_window.withdraw()
+    root.withdraw()
+    
+    cre=Tk()
+    cre.geometry('400x400')
+    cre.title('SUDO-GEN - Create Account')
+    # Swapped purple3 to purple4 -> purple4 to purple3
+    cre.config(bg='purple4')
+
+    creacnt = Frame(cre,height = 300 , width = 300 , bd=2, relief=SOLID, highlightthickness=2, highlightbackground="white")
+    # Swapped purple3 to purple4 -> purple4 to purple3
+    creacnt.configure(bg='purple4')
+
+    spcre= Label(creacnt, text = "SUDO-GEN Account Creation", foreground='white')
+    # Swapped purple3 to purple4 -> purple4 to purple3
+    spcre.configure(bg='purple4')
+    spcre.config(font=('TimesNewRoman',13, 'bold'))
+    spcre.pack(pady=10)
+
+    h= Label(creacnt, text = "Create Username", bg='purple4', foreground='white', font=('TimesNewRoman',10))
+    h.pack()
+    h_entry= Entry(creacnt,font=('TimesNewRoman',10))
+    h_entry.pack()
+
+    p= Label(creacnt, text = "Create Password", bg='purple4', foreground='white', font=('TimesNewRoman',10))
+    p.pack()
+    p_entry = Entry(creacnt,show = "*")
+    p_entry.pack()
+
+    cp=Label(creacnt, text='Confirm Password', bg='purple4', foreground='white', font=('TimesNewRoman',10))
+    cp.pack()
+    cp_entry=Entry(creacnt, show='*')
+    cp_entry.pack()
+
+    cresp=Label(creacnt, text = ' ', foreground='purple4', bg='purple4')
+    cresp.pack(pady=5)
+    
+    def create_account():
+        user = h_entry.get()
+        paswod = p_entry.get()
+        cpaswod = cp_entry.get()
+        if not user or not paswod:
+             messagebox.showerror('ACCOUNT FAILED',"Username and Password cannot be empty.")
+             return
+             
+        if cpaswod == paswod:
+                sub_cre.config(state=DISABLED)
+                run_db_task(account_created, create_user, db_store, user, paswod)
+        else:
+            messagebox.showerror('ACCOUNT FAILED',"Passwords don't match")
+
+    def account_created(created, err):
+        try:
+            sub_cre.config(state=NORMAL)
+        except TclError: # The window was closed while the account was being saved
+            return
+        if err is not None:
+            messagebox.showerror("Database Error", f"Failed to insert user: {err}")
+            cre.destroy()
+            root.deiconify()
+            return
+        if created:
+            messagebox.showinfo("ACCOUNT CREATED","Account has been created")
+            cre.destroy()
+            if prev_window:
+                prev_window.deiconify() # Restore home window if came from there
+            else:
+                root.deiconify() # Restore login window
+        else:
+            messagebox.showerror('USERNAME TAKEN',"Please enter another username")
+            
+    sub_cre=Button(creacnt, text='CREATE ACCOUNT', command=create_account, fg='black')
+    sub_cre.pack(pady=5)
+    
+    def cr_back():
+        cre.destroy()
+        if prev_window:
+            prev_window.deiconify()
+        else:
+            root.deiconify()
+        
+    creback=Button(creacnt, text='BACK TO LOGIN PAGE', command=cr_back, fg='black')
+    creback.pack(pady=5)
+    creacnt.place(relx= 0.5, rely = 0.5, anchor = CENTER)
+    
+    cre.mainloop()
+
+
+def run_login():
+    """Opens the login window, connects to the database and runs the Tk main loop."""
+    global root, usr, pas, login_btn, db_store, db_connected, db_executor, session_writer
+
+    # root (Login Window)
+    root = Tk()
+    root.title('SUDO-GEN - User Login')
+    root.geometry("1050x603")
+
+    # --- Database Connection Setup ---
+    try:
+        # MySQL by default; SUDOGEN_STORAGE=sqlite uses a local database file instead
+        db_store = open_storage()
+        db_connected = True
+        # Also replays game history a crashed earlier run left in the journal
+        session_writer = SessionWriter(db_store)
+    except StorageError as e:
+        messagebox.showerror("Database Error", f"Could not open the {STORAGE_BACKEND} database. Login/Account features will be disabled. Error: {e}")
+        db_connected = False
+
+
+    # Login Frame Setup
+    try:
+        bg=PhotoImage(file ='login (1).png')
+    except TclError:
+        bg = PhotoImage(width=1, height=1)
+        root.configure(bg='purple4')
+    
+    canvas_login=Canvas(root,width=800,height=800)
+    canvas_login.pack(fill='both',expand=True)
+    canvas_login.create_image(0,0,image=bg,anchor='nw')
+
+
+    login = Frame(root,height = 700 , width = 500)
+    login.configure(bg='purple4')
+
+    wel = Label(login, text = "     WELCOME TO SUDO-GEN     ",foreground='white')
+    wel.configure(bg='purple4')
+    wel.config(font=('TimesNewRoman',13,))
+    wel.pack(pady=10)
+
+    lu = Label(login, text = "Enter Username", bg='purple4', foreground='white', font=('TimesNewRoman',10))
+    lu.pack()
+
+    usr= Entry(login, font=('TimesNewRoman',10))
+    usr.pack()
+
+    lp = Label(login, text = "Enter Password", bg='purple4', foreground='white', font=('TimesNewRoman',10))
+    lp.pack()
+
+    pas = Entry(login,show = "*")
+    pas.pack()
+
+
+    login_btn = Button(login, text = "Enter",command = homeopen, fg='black')
+    login_btn.pack(pady=10)
+
+    crac=Button(login, text='Create Account', command=lambda: cracc(None), fg='black')
+    crac.pack(pady=10)
+    login.place(relx = 0.5,rely = 0.5 , anchor = CENTER)
+
+    db_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="sudogen-db")
+    try:
+        root.mainloop()
+    finally:
+        db_executor.shutdown(wait=False)
+        if session_writer is not None:
+            session_writer.close() # Saves the queued game history before exiting
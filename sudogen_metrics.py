@@ -0,0 +1,190 @@
+"""
+Optional instrumentation: phase timers, counters and a periodic JSON dump.
+
+Off by default. While disabled, timer() hands back one shared no-op context manager
+and callers skip count() behind `if metrics.enabled`, so the hot paths pay one
+attribute check. Enable it with enable(), or by setting SUDOGEN_METRICS=1 before
+SudoGenProject starts; SUDOGEN_METRICS_FILE then names a file the stats are dumped to
+every SUDOGEN_METRICS_INTERVAL seconds (default 10) and at exit.
+
+Timer names are dotted phases: "generate.fill", "create_puzzle.remove",
+"create_puzzle.verify", "grade", "solve", "server.request", and "frame.events",
+"frame.draw", "frame.flip", "frame.total" from the game loop.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+
+DUMP_INTERVAL = 10.0
+BUCKETS = 40 # Bucket k holds durations of [2**(k-1), 2**k) microseconds; bucket 0 is under 1 us
+
+enabled = False
+_timers = {}
+_counters = {}
+_lock = threading.Lock()
+_dumper = None
+
+
+class TimerStats:
+    """Count, total, extremes and a power-of-two histogram of one timer's durations."""
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min: self.min = seconds
+        if seconds > self.max: self.max = seconds
+        self.buckets[min(int(seconds * 1e6).bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, pct):
+        """Upper edge, in seconds, of the bucket holding the pct-th percentile (capped at max)."""
+        rank = self.count * pct / 100
+        seen = 0
+        for k, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min((1 << k) / 1e6, self.max)
+        return self.max
+
+    def as_dict(self):
+        ms = 1000
+        return {
+            "count": self.count,
+            "total_ms": self.total * ms,
+            "mean_ms": self.total / self.count * ms,
+            "min_ms": self.min * ms,
+            "max_ms": self.max * ms,
+            "p50_ms": self.percentile(50) * ms,
+            "p90_ms": self.percentile(90) * ms,
+            "p99_ms": self.percentile(99) * ms,
+            # Histogram: upper bucket edge in microseconds -> count, empty buckets left out
+            "histogram_us": {str(1 << k): n for k, n in enumerate(self.buckets) if n},
+        }
+
+
+def record(name, seconds):
+    """Adds one duration to the named timer."""
+    with _lock:
+        stats = _timers.get(name)
+        if stats is None:
+            stats = _timers[name] = TimerStats()
+        stats.add(seconds)
+
+
+def count(name, n=1):
+    """Adds n to the named counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name):
+    """Context manager that records the time spent in its block under name, if enabled."""
+    return _Timer(name) if enabled else _NULL_TIMER
+
+
+def stats():
+    """Snapshot of every timer and counter recorded so far."""
+    with _lock:
+        return {
+            "enabled": enabled,
+            "timers": {name: s.as_dict() for name, s in sorted(_timers.items())},
+            "counters": dict(sorted(_counters.items())),
+        }
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def dump(path):
+    """Writes stats() as JSON to path, replacing it atomically."""
+    snapshot = stats()
+    snapshot["time"] = time.time()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class _Dumper(threading.Thread):
+    def __init__(self, path, interval):
+        super().__init__(name="sudogen-metrics-dump", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            dump(self.path)
+
+    def stop(self):
+        self.stopped.set()
+        dump(self.path) # Final state
+
+
+def enable(dump_path=None, interval=DUMP_INTERVAL):
+    """Starts recording; with dump_path, also writes the stats there every interval seconds and at exit."""
+    global enabled, _dumper
+    enabled = True
+    if dump_path and _dumper is None:
+        _dumper = _Dumper(dump_path, interval)
+        _dumper.start()
+        atexit.register(_stop_dumper)
+
+
+def _stop_dumper():
+    global _dumper
+    if _dumper is not None:
+        _dumper.stop()
+        _dumper = None
+
+
+def disable():
+    """Stops recording (the data so far is kept until reset()) and any periodic dump."""
+    global enabled
+    enabled = False
+    _stop_dumper()
+
+
+def enable_from_env():
+    """Calls enable() if SUDOGEN_METRICS is set to something other than 0 or empty."""
+    if os.environ.get("SUDOGEN_METRICS", "0") not in ("", "0"):
+        enable(os.environ.get("SUDOGEN_METRICS_FILE"),
+               float(os.environ.get("SUDOGEN_METRICS_INTERVAL", DUMP_INTERVAL)))
@@ -0,0 +1,86 @@
+"""MySQL storage backend on a reconnecting connection pool."""
+from contextlib import contextmanager
+
+import mysql.connector as sqlcon
+from mysql.connector import pooling
+
+from sudogen_storage import Storage, StorageError
+
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "passwd": "sql123",
+    "database": "planner",
+    "collation": "utf8mb4_unicode_ci",
+    "charset": "utf8mb4",
+}
+POOL_SIZE = 3 # The login worker threads plus the game history writer
+RECONNECT_ATTEMPTS = 3 # Tries per connection handed out, before giving up
+RECONNECT_DELAY = 1 # Seconds between those tries
+
+# Raised when the server went away or the socket died; worth one retry on a fresh connection
+CONNECTION_ERRORS = (sqlcon.errors.OperationalError, sqlcon.errors.InterfaceError)
+
+
+class ConnectionPool:
+    """
+    A small pool of MySQL connections that survives server restarts and idle timeouts.
+
+    Every connection is pinged with reconnect=True as it is handed out, and a query that
+    still fails with a connection error is retried once on another connection, so a
+    dropped link costs one reconnect instead of disabling logins until restart.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, **config):
+        self.config = dict(DB_CONFIG, **config)
+        self._pool = pooling.MySQLConnectionPool(pool_name="sudogen", pool_size=pool_size, **self.config)
+
+    @contextmanager
+    def connection(self):
+        """Borrows a live connection and returns it to the pool afterwards."""
+        con = self._pool.get_connection()
+        try:
+            con.ping(reconnect=True, attempts=RECONNECT_ATTEMPTS, delay=RECONNECT_DELAY)
+            yield con
+        finally:
+            con.close() # Hands it back to the pool rather than closing the socket
+
+    def run(self, work):
+        """Calls work(con, cursor) and returns its result, retrying once if the connection drops."""
+        for attempt in range(2):
+            try:
+                with self.connection() as con:
+                    cursor = con.cursor()
+                    try:
+                        return work(con, cursor)
+                    finally:
+                        cursor.close()
+            except CONNECTION_ERRORS:
+                if attempt:
+                    raise
+
+
+class MySQLStorage(Storage):
+    """Storage backend on the MySQL server in DB_CONFIG; tables come from schema.sql."""
+    placeholder = "%s"
+    integrity_errors = (sqlcon.errors.IntegrityError,)
+
+    def __init__(self, pool_size=POOL_SIZE, **config):
+        try:
+            self.pool = ConnectionPool(pool_size, **config)
+        except sqlcon.Error as err:
+            raise StorageError(str(err)) from err
+
+    def _run(self, work):
+        def transaction(con, cursor):
+            try:
+                result = work(cursor)
+            except BaseException:
+                con.rollback()
+                raise
+            con.commit()
+            return result
+        try:
+            return self.pool.run(transaction)
+        except sqlcon.Error as err:
+            raise StorageError(str(err)) from err
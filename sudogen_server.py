@@ -0,0 +1,445 @@
+"""
+Local puzzle service: an asyncio HTTP server that hands out pre-generated puzzles and
+solves and checks boards, so several clients share one warm generator.
+
+    python SudoGenProject.py serve --port 8765 -d easy -d medium
+    curl 'http://127.0.0.1:8765/puzzle?difficulty=medium'
+
+Endpoints (GET, JSON responses):
+    /puzzle?difficulty=BAND&size=9     a puzzle, its solution and grade, from the pool
+    /puzzle?id=SEED_ID                 the seeded puzzle with that ID (see sudogen_cache)
+    /daily?difficulty=BAND&size=9      today's puzzle, the same for every client
+    /solve?puzzle=BOARD                solution of any board, within a node budget
+    /validate?board=BOARD[&puzzle=..]  conflicting cells, and whether board is solved
+    /stats                             pool levels and request counts
+
+Boards are board_to_string strings. Each (difficulty, size) pair has a pool of ready
+puzzles that a process pool keeps topped up to POOL_SIZE. When clients take puzzles
+faster than it refills, requests wait up to WAIT_TIMEOUT seconds for one; once
+MAX_WAITING requests are already waiting on a pool, further ones are turned away at
+once with 503 and a Retry-After header rather than queueing without bound. Seeded
+puzzles are kept in PUZZLE_CACHE, so after the first request for an ID (such as the
+day's puzzle) the rest are cache hits; generating them is bounded the same way, and
+at most one per worker process is generated at a time. Malformed requests get 400,
+and anything that fails on the server's side 500.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import math
+import os
+import signal
+import sys
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import sudogen_metrics as metrics
+from sudogen_batch import PuzzleProducer
+from sudogen_cache import PUZZLE_CACHE, daily_seed
+from sudogen_core import (BOX_SIZE, BOX_SIZES, DEFAULT_DIFFICULTY, DIFFICULTY_BANDS, GradeResult,
+                          board_to_string, is_valid, make_puzzle, parse_seed_id, puzzle_id, seed_id, solve_bounded,
+                          string_to_board)
+
+PUZZLE_SERVER_URL = os.environ.get("SUDOGEN_SERVER") # When set, the game takes its puzzles from this server
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+POOL_SIZE = 32 # Ready puzzles kept per (difficulty, size)
+MAX_WAITING = 64 # Requests allowed to wait on an empty pool before more are refused
+WAIT_TIMEOUT = 5.0 # Longest a request waits for the pool, in seconds
+RETRY_AFTER = 1 # Seconds suggested to refused clients
+POOL_GENERATION_TIMEOUT = 10.0 # Per puzzle, before the closest band is taken (see generate_graded_puzzle)
+SOLVE_MAX_NODES = 200000
+SOLVE_TIMEOUT = 2.0
+
+BANDS = [name for name, _ in DIFFICULTY_BANDS]
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    """Turned into an error response with a JSON {"error": message} body."""
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class _Pool:
+    """Ready puzzles of one (difficulty, box_size); slots counts free places, generating or ready ones hold the rest."""
+    def __init__(self, size):
+        self.ready = asyncio.Queue()
+        self.slots = asyncio.Semaphore(size)
+        self.waiting = 0
+        self.generated = 0
+        self.served = 0
+        self.refused = 0
+        self.tasks = []
+
+
+class PuzzleServer:
+    """
+    The service itself. start() opens the process pool and begins filling the pools of
+    the given difficulties and box sizes; pools for other pairs are created on first request.
+    """
+    def __init__(self, difficulties=(DEFAULT_DIFFICULTY,), box_sizes=(BOX_SIZE,), pool_size=POOL_SIZE,
+                 workers=None, max_waiting=MAX_WAITING, wait_timeout=WAIT_TIMEOUT, cache=PUZZLE_CACHE):
+        self.difficulties = difficulties
+        self.box_sizes = box_sizes
+        self.pool_size = pool_size
+        self.workers = workers or os.cpu_count() or 1
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.pools = {}
+        self.cache = cache
+        self.generating = {} # seed_id -> future of a seeded puzzle being generated
+        self.seeded_waiting = 0
+        self.seeded_refused = 0
+        self.requests = 0
+        self.started = time.time()
+        self.executor = None
+        self.server = None
+        self.routes = {"/puzzle": self.get_puzzle, "/daily": self.daily, "/solve": self.solve,
+                       "/validate": self.validate, "/stats": self.stats}
+
+    async def start(self, host=SERVER_HOST, port=SERVER_PORT):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        # Start the workers before any socket is open: a worker forked later would inherit
+        # the connections open at the time and hold them open after the server closes them
+        await asyncio.get_running_loop().run_in_executor(self.executor, os.getpid)
+        for difficulty in self.difficulties:
+            for box_size in self.box_sizes:
+                self._pool(difficulty, box_size)
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for pool in self.pools.values():
+            for task in pool.tasks:
+                task.cancel()
+            await asyncio.gather(*pool.tasks, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True) # Waits for at most one puzzle per worker
+
+    # --- Pools ---
+
+    def _pool(self, difficulty, box_size):
+        pool = self.pools.get((difficulty, box_size))
+        if pool is None:
+            pool = self.pools[(difficulty, box_size)] = _Pool(self.pool_size)
+            # One refill task per worker process, so an empty pool is filled on every core
+            pool.tasks = [asyncio.ensure_future(self._refill(pool, difficulty, box_size))
+                          for _ in range(self.workers)]
+        return pool
+
+    async def _refill(self, pool, difficulty, box_size):
+        loop = asyncio.get_running_loop()
+        while True:
+            await pool.slots.acquire() # Blocks while the pool is full
+            try:
+                puzzle = await loop.run_in_executor(self.executor, make_puzzle, difficulty, None, box_size,
+                                                    POOL_GENERATION_TIMEOUT)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err: # A worker died; free the slot and try again shortly
+                pool.slots.release()
+                print(f"puzzle generation failed: {err!r}", file=sys.stderr)
+                await asyncio.sleep(RETRY_AFTER)
+                continue
+            pool.generated += 1
+            pool.ready.put_nowait(puzzle)
+
+    async def take(self, difficulty=DEFAULT_DIFFICULTY, box_size=BOX_SIZE):
+        """Returns a ready (full_board, puzzle, grade), waiting for the pool if needed; HTTPError 503 under overload."""
+        pool = self._pool(difficulty, box_size)
+        if pool.ready.empty() and pool.waiting >= self.max_waiting:
+            pool.refused += 1
+            raise HTTPError(503, "puzzle pool is empty; retry later", {"Retry-After": str(RETRY_AFTER)})
+        pool.waiting += 1
+        try:
+            puzzle = await asyncio.wait_for(pool.ready.get(), self.wait_timeout)
+        except asyncio.TimeoutError:
+            pool.refused += 1
+            raise HTTPError(503, "timed out waiting for a puzzle; retry later",
+                            {"Retry-After": str(RETRY_AFTER)}) from None
+        finally:
+            pool.waiting -= 1
+        pool.slots.release()
+        pool.served += 1
+        return puzzle
+
+    async def seeded(self, key):
+        """
+        The seeded puzzle key names, from the cache or generated once in the process pool however
+        many ask. Like take(), HTTPError 503 once max_waiting requests wait, or one has waited
+        wait_timeout seconds; new puzzles are also refused while every worker is generating one.
+        A puzzle whose requests all gave up is still finished and cached for the next one.
+        """
+        try:
+            seed, difficulty, box_size = parse_seed_id(key)
+        except ValueError as err:
+            raise HTTPError(400, str(err)) from None
+        key = seed_id(seed, difficulty, box_size)
+        puzzle = self.cache.lookup(key)
+        if puzzle is not None:
+            return key, puzzle
+        future = self.generating.get(key)
+        if self.seeded_waiting >= self.max_waiting or (future is None and len(self.generating) >= self.workers):
+            self.seeded_refused += 1
+            raise HTTPError(503, "too many seeded puzzles being generated; retry later", {"Retry-After": str(RETRY_AFTER)})
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self.generating[key] = loop.run_in_executor(
+                self.executor, functools.partial(make_puzzle, difficulty, box_size=box_size, seed=seed))
+            def done(future):
+                self.generating.pop(key, None)
+                if not future.cancelled() and future.exception() is None: self.cache.put(key, future.result())
+            future.add_done_callback(done)
+        self.seeded_waiting += 1
+        try:
+            # Shielded: a client hanging up or timing out must not cancel it for the others
+            return key, await asyncio.wait_for(asyncio.shield(future), self.wait_timeout)
+        except asyncio.TimeoutError:
+            self.seeded_refused += 1
+            raise HTTPError(503, "puzzle is still being generated; retry later",
+                            {"Retry-After": str(RETRY_AFTER)}) from None
+        finally:
+            self.seeded_waiting -= 1
+
+    # --- Endpoints: each takes the query parameters and returns a JSON-serializable body ---
+
+    async def get_puzzle(self, params):
+        if "id" in params:
+            key, puzzle = await self.seeded(params["id"])
+            return _puzzle_body(puzzle, parse_seed_id(key)[1], key)
+        difficulty = _difficulty_param(params)
+        box_size = _box_size_param(params.get("size", "9"))
+        return _puzzle_body(await self.take(difficulty, box_size), difficulty)
+
+    async def daily(self, params):
+        difficulty = _difficulty_param(params)
+        box_size = _box_size_param(params.get("size", "9"))
+        key, puzzle = await self.seeded(seed_id(daily_seed(), difficulty, box_size))
+        return _puzzle_body(puzzle, difficulty, key)
+
+    async def solve(self, params):
+        board = _board_param(params, "puzzle")
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, solve_bounded, board, SOLVE_MAX_NODES, SOLVE_TIMEOUT)
+        return {"status": result.status, "nodes": result.nodes,
+                "solution": board_to_string(result.board) if result.board is not None else None}
+
+    async def validate(self, params):
+        board = _board_param(params, "board")
+        size = len(board)
+        conflicts = [[r, c] for r in range(size) for c in range(size)
+                     if board[r][c] != 0 and not is_valid(board, board[r][c], (r, c))]
+        complete = all(all(row) for row in board)
+        body = {"valid": not conflicts, "complete": complete, "solved": complete and not conflicts,
+                "conflicts": conflicts}
+        if "puzzle" in params:
+            puzzle = _board_param(params, "puzzle")
+            if len(puzzle) != size:
+                raise HTTPError(400, "board and puzzle differ in size")
+            body["matches_puzzle"] = all(puzzle[r][c] in (0, board[r][c]) for r in range(size) for c in range(size))
+            body["solved"] = body["solved"] and body["matches_puzzle"]
+        return body
+
+    async def stats(self, params):
+        return {
+            "uptime": time.time() - self.started,
+            "requests": self.requests,
+            "workers": self.workers,
+            "pools": {f"{difficulty}/{box_size * box_size}": {
+                "ready": pool.ready.qsize(), "capacity": self.pool_size, "waiting": pool.waiting, "generated": pool.generated,
+                "served": pool.served, "refused": pool.refused,
+            } for (difficulty, box_size), pool in self.pools.items()},
+            "seeded": {"generating": len(self.generating), "waiting": self.seeded_waiting, "refused": self.seeded_refused},
+            "cache": self.cache.stats(),
+        }
+
+    # --- HTTP/1.1 with keep-alive ---
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line: break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""): break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = headers.get("content-length") or "0"
+                if not length.isdigit():
+                    # Where this request ends is unknown, so the connection cannot be reused
+                    writer.write(_response(400, {"error": "malformed Content-Length"}, False, {}))
+                    await writer.drain()
+                    break
+                if int(length): await reader.readexactly(int(length)) # Bodies are not used
+                parts = request_line.decode("latin-1").split()
+                keep_alive = (len(parts) == 3 and parts[2] == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                status, body, extra_headers = await self._dispatch(parts)
+                writer.write(_response(status, body, keep_alive, extra_headers))
+                await writer.drain()
+                if not keep_alive: break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError: # readline() past the stream's limit: a request or header line too long
+            writer.write(_response(400, {"error": "request line or header too long"}, False, {}))
+        finally:
+            writer.close()
+
+    async def _dispatch(self, parts):
+        self.requests += 1
+        with metrics.timer("server.request"):
+            try:
+                if len(parts) != 3:
+                    raise HTTPError(400, "malformed request line")
+                method, target, _ = parts
+                url = urlsplit(target)
+                handler = self.routes.get(url.path)
+                if handler is None:
+                    raise HTTPError(404, f"no such endpoint {url.path!r}; try {sorted(self.routes)}")
+                if method != "GET":
+                    raise HTTPError(405, "only GET is supported", {"Allow": "GET"})
+                params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                return 200, await handler(params), {}
+            except HTTPError as err:
+                return err.status, {"error": str(err)}, err.headers
+            except Exception as err: # A bug, or a worker process that died; not the client's fault
+                print(f"error handling {parts[1]!r}: {err!r}", file=sys.stderr)
+                return 500, {"error": "internal server error"}, {}
+
+
+def _response(status, body, keep_alive, extra_headers):
+    payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    head += [f"{name}: {value}" for name, value in extra_headers.items()]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload
+
+
+def _puzzle_body(puzzle, difficulty, key=None):
+    full_board, board, grade = puzzle
+    return {
+        "id": puzzle_id(board),
+        "seed_id": key, # Only for seeded puzzles; requesting it again gives the same puzzle
+        "difficulty": difficulty,
+        "size": len(board),
+        "puzzle": board_to_string(board),
+        "solution": board_to_string(full_board),
+        "grade": grade._asdict() if grade is not None else None,
+    }
+
+
+def _difficulty_param(params):
+    difficulty = params.get("difficulty", DEFAULT_DIFFICULTY)
+    if difficulty not in BANDS:
+        raise HTTPError(400, f"difficulty must be one of {BANDS}")
+    return difficulty
+
+
+def _box_size_param(value):
+    """Box size for a size parameter such as "9" or "16"."""
+    size = int(value) if value.isdigit() else 0
+    box = math.isqrt(size)
+    if box * box != size or box not in BOX_SIZES:
+        raise HTTPError(400, f"size must be one of {[b * b for b in BOX_SIZES]}")
+    return box
+
+
+def _board_param(params, name):
+    if name not in params:
+        raise HTTPError(400, f"missing parameter {name!r}")
+    try:
+        return string_to_board(params[name])
+    except ValueError as err:
+        raise HTTPError(400, f"{name}: {err}") from None
+
+
+# --- Client ---
+
+class PuzzleClient(PuzzleProducer):
+    """
+    A PuzzleProducer whose background thread takes its puzzles from a running server,
+    so get() is still a queue pop and never waits on the network. Whatever the server
+    cannot supply (it is unreachable, or turns the request away) the thread generates
+    locally instead.
+    """
+    def __init__(self, url, difficulties=(DEFAULT_DIFFICULTY,), size=3, box_size=BOX_SIZE, timeout=WAIT_TIMEOUT + 1):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        super().__init__(difficulties, size, box_size=box_size) # Starts the thread, so set up first
+
+    def _fetch(self, query):
+        """(full_board, puzzle, grade) from /puzzle?query; OSError or ValueError if that fails."""
+        with urllib.request.urlopen(f"{self.url}/puzzle?{urlencode(query)}", timeout=self.timeout) as response:
+            body = json.load(response) # URLError and HTTPError are OSErrors
+        grade = GradeResult(**body["grade"]) if body["grade"] is not None else None
+        return string_to_board(body["solution"]), string_to_board(body["puzzle"]), grade
+
+    def _produce(self, difficulty):
+        try:
+            return self._fetch({"difficulty": difficulty, "size": self.box_size * self.box_size})
+        except (OSError, ValueError):
+            return super()._produce(difficulty)
+
+    def seeded(self, key):
+        """The puzzle a seed_id names, from the server's cache, or this process's if the server cannot be reached."""
+        try:
+            return self._fetch({"id": key})
+        except (OSError, ValueError):
+            return PUZZLE_CACHE.get(key)
+
+
+# --- Command line ---
+
+async def _serve(server, host, port):
+    await server.start(host, port)
+    print(f"Serving puzzles on http://{host}:{port} with {server.workers} worker processes", file=sys.stderr)
+    stopped = asyncio.Event()
+    try:
+        # SIGTERM shuts down like Ctrl+C, so the worker processes are not left behind
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopped.set)
+    except NotImplementedError: # Windows
+        pass
+    try:
+        await stopped.wait() # Until interrupted
+    finally:
+        await server.close()
+
+
+def serve_main(argv):
+    """Command line entry point: python SudoGenProject.py serve [options]."""
+    parser = argparse.ArgumentParser(prog="SudoGenProject.py serve",
+                                     description="Serve puzzles, solutions and validation over HTTP on localhost.")
+    parser.add_argument("--host", default=SERVER_HOST, help="address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="port to listen on (default: %(default)s)")
+    parser.add_argument("-d", "--difficulty", action="append", choices=BANDS,
+                        help="band to keep a pool of from the start; repeatable (default: %s)" % DEFAULT_DIFFICULTY)
+    parser.add_argument("--size", type=int, action="append", choices=[b * b for b in BOX_SIZES],
+                        help="grid size to keep pools of from the start; repeatable (default: 9)")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE, help="ready puzzles per pool (default: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="generator processes (default: all cores)")
+    parser.add_argument("--max-waiting", type=int, default=MAX_WAITING,
+                        help="requests that may wait on an empty pool before more get 503 (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    server = PuzzleServer(tuple(args.difficulty or [DEFAULT_DIFFICULTY]),
+                          tuple(math.isqrt(size) for size in args.size or [9]),
+                          args.pool_size, args.workers, args.max_waiting)
+    try:
+        asyncio.run(_serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,231 @@
+"""
+Game history: a per-game recorder and a write-behind queue that saves it to storage.
+
+The game loop only appends to an in-memory queue and a local journal file; a background
+thread commits the queue to the database in batches. Whatever has not been committed
+when the process dies is still in the journal and is replayed by the next SessionWriter
+opened on it. The history command prints what has been saved.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+
+from sudogen_core import MAX_WRONG, board_to_string, puzzle_id
+from sudogen_storage import MoveRecord, SessionRecord, StorageError, open_storage
+
+SESSION_JOURNAL_FILE = "sudogen_sessions.journal"
+FLUSH_INTERVAL = 1.0 # Longest a record waits in the queue, in seconds
+FLUSH_BATCH_SIZE = 200 # Records that trigger a flush before the interval is up
+RETRY_INTERVAL = 5.0 # Wait after a failed flush before trying again
+
+_RECORD_TYPES = {"s": SessionRecord, "m": MoveRecord}
+_RECORD_TAGS = {SessionRecord: "s", MoveRecord: "m"}
+
+
+def _journal_line(record):
+    return json.dumps({"t": _RECORD_TAGS[type(record)], "r": list(record)}, separators=(",", ":")) + "\n"
+
+
+class SessionWriter:
+    """
+    Batches SessionRecords and MoveRecords into storage off the calling thread.
+
+    put() appends the record to the journal (flushed to the OS, not fsynced, so it survives
+    a crash of this process but not of the machine) and to the queue, and returns at once.
+    The writer thread commits the queue every FLUSH_INTERVAL seconds, or sooner once
+    FLUSH_BATCH_SIZE records are waiting, then rewrites the journal to hold only what is
+    still queued. Saves are REPLACEs keyed on session_id and (session_id, seq), so records
+    that are replayed from the journal after already being committed do no harm.
+    """
+
+    def __init__(self, storage, journal_path=SESSION_JOURNAL_FILE,
+                 flush_interval=FLUSH_INTERVAL, batch_size=FLUSH_BATCH_SIZE):
+        self.storage = storage
+        self.journal_path = journal_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.last_error = None # Most recent StorageError from a flush, for display or logging
+        self._queue = deque(self._recover())
+        self._lock = threading.Lock() # Guards the queue and the journal handle
+        self._flush_lock = threading.Lock() # One flush at a time
+        self._wake = threading.Event()
+        self._stop = False
+        self._journal = open(journal_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="sudogen-session-writer", daemon=True)
+        self._thread.start()
+        if self._queue:
+            self._wake.set()
+
+    def _recover(self):
+        """Reads records left in the journal by a previous run; a torn last line is skipped."""
+        records = []
+        try:
+            with open(self.journal_path, encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                        records.append(_RECORD_TYPES[entry["t"]](*entry["r"]))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+
+    def put(self, record):
+        """Queues a SessionRecord or MoveRecord for saving; never waits on the database."""
+        line = _journal_line(record)
+        with self._lock:
+            self._journal.write(line)
+            self._journal.flush()
+            self._queue.append(record)
+            full = len(self._queue) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def pending(self):
+        """Number of records not yet committed."""
+        return len(self._queue)
+
+    def flush(self):
+        """Commits everything queued so far on the calling thread. Returns False if storage failed."""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._queue)
+            if not batch:
+                return True
+            sessions = {}
+            moves = []
+            for record in batch:
+                if isinstance(record, SessionRecord):
+                    sessions[record.session_id] = record # Only the latest state of each session matters
+                else:
+                    moves.append(record)
+            try:
+                self.storage.save_sessions(sessions.values())
+                self.storage.save_moves(moves)
+            except StorageError as err:
+                self.last_error = err
+                return False
+            self.last_error = None
+            with self._lock:
+                for _ in range(len(batch)):
+                    self._queue.popleft()
+                self._rewrite_journal()
+            return True
+
+    def _rewrite_journal(self):
+        """Replaces the journal with the records still queued. Called with _lock held."""
+        self._journal.close()
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            for record in self._queue:
+                out.write(_journal_line(record))
+        os.replace(tmp_path, self.journal_path)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def _run(self):
+        while not self._stop:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if not self.flush() and not self._stop:
+                self._wake.wait(RETRY_INTERVAL)
+
+    def close(self):
+        """Stops the writer thread and commits what is left; anything that fails stays in the journal."""
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+        flushed = self.flush()
+        with self._lock:
+            self._journal.close()
+            if flushed and not self._queue:
+                os.remove(self.journal_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SessionRecorder:
+    """
+    Logs one game for a user: set as GridState.recorder, it receives every move, and
+    finish() records the outcome. Records go to a SessionWriter, so nothing here blocks.
+    The session's difficulty is the puzzle's graded band, or difficulty (the one asked
+    for) if it is ungraded. Its puzzle_id is seed_key, the puzzle's seed_id, for seeded
+    puzzles, so they can be regenerated from it; otherwise the puzzle_id() hash of the givens.
+    """
+
+    def __init__(self, writer, username, grid, difficulty, seed_key=None):
+        self.writer = writer
+        self.grid = grid
+        self.seq = 0
+        self.hints_used = 0
+        self.auto_solved = False
+        self.finished = False
+        self.session = SessionRecord(
+            session_id=uuid.uuid4().hex, username=username, puzzle_id=seed_key or puzzle_id(grid.initial_board),
+            difficulty=grid.grade.band if grid.grade is not None else str(difficulty),
+            puzzle=board_to_string(grid.initial_board),
+            solution=board_to_string(grid.full_board), started_at=time.time(), ended_at=None,
+            wrong_attempts=0, hints_used=0, solved=False, solve_seconds=None)
+        writer.put(self.session)
+        grid.recorder = self
+
+    def move(self, kind, row, col, value):
+        self.seq += 1
+        if kind == "hint": self.hints_used += 1
+        elif kind == "solve": self.auto_solved = True
+        self.writer.put(MoveRecord(self.session.session_id, self.seq, time.time(), kind, row, col, value))
+
+    def finish(self):
+        """Records the end of the game, solved or not; later calls do nothing."""
+        if self.finished: return
+        self.finished = True
+        grid = self.grid
+        ended_at = time.time()
+        solved = (not self.auto_solved and grid.wrong_attempts < MAX_WRONG
+                  and grid.correct_count == grid.total_blanks)
+        self.session = self.session._replace(
+            ended_at=ended_at, wrong_attempts=grid.wrong_attempts, hints_used=self.hints_used,
+            solved=solved, solve_seconds=ended_at - self.session.started_at if solved else None)
+        self.writer.put(self.session)
+        grid.recorder = None
+
+
+def _outcome(session):
+    if session.ended_at is None: return "in progress"
+    if session.solved: return f"solved in {session.solve_seconds:.0f}s"
+    return "lost" if session.wrong_attempts >= MAX_WRONG else "unsolved"
+
+def history_main(argv):
+    """Command line entry point: python SudoGenProject.py history USERNAME [-n COUNT] [--moves]."""
+    parser = argparse.ArgumentParser(prog="SudoGenProject.py history", description="Show a user's recorded games.")
+    parser.add_argument("username")
+    parser.add_argument("-n", "--count", type=int, default=10, help="games to show, newest first (default: %(default)s)")
+    parser.add_argument("--moves", action="store_true", help="list each game's moves too")
+    args = parser.parse_args(argv)
+
+    try:
+        with open_storage() as storage:
+            sessions = storage.recent_sessions(args.username, args.count)
+            for session in sessions:
+                started = time.strftime("%Y-%m-%d %H:%M", time.localtime(session.started_at))
+                print(f"{started}  {session.difficulty:8} {_outcome(session):18} wrong {session.wrong_attempts}"
+                      f"  hints {session.hints_used}  {session.puzzle_id}")
+                if not args.moves: continue
+                for move in storage.session_moves(session.session_id):
+                    cell = "" if move.kind == "solve" else f"R{move.cell_row + 1}C{move.cell_col + 1} {move.value}"
+                    print(f"    {move.seq:4} {move.at - session.started_at:8.1f}s  {move.kind:6} {cell}")
+    except StorageError as err:
+        print(f"Could not read the game history: {err}", file=sys.stderr)
+        return 1
+    if not sessions:
+        print(f"No games recorded for {args.username}", file=sys.stderr)
+    return 0
@@ -0,0 +1,329 @@
+"""
+Storage for accounts, game sessions and puzzle banks behind one interface.
+
+Two backends implement it: SQLiteStorage, an embedded database file that needs no
+server, and MySQLStorage in sudogen_mysql. open_storage() picks one from the
+SUDOGEN_STORAGE environment variable ("mysql" by default, or "sqlite").
+open_bank() serves puzzles from either a bank file or the storage's puzzles table.
+"""
+import json
+import os
+import random
+import sqlite3
+import threading
+from collections import namedtuple
+
+from sudogen_auth import dummy_verify, hash_password, needs_rehash, verify_password
+from sudogen_bank import PUZZLE_BANK_FILE, bank_label, open_puzzle_bank
+from sudogen_core import board_to_string, grade_from_steps, string_to_board
+
+STORAGE_BACKEND = os.environ.get("SUDOGEN_STORAGE", "mysql")
+SQLITE_PATH = os.environ.get("SUDOGEN_SQLITE_PATH", "sudogen.db")
+DB_BANK = "db:" # Bank location naming the puzzles table of the configured storage
+PUZZLE_BANK = os.environ.get("SUDOGEN_BANK", PUZZLE_BANK_FILE) # Where the game draws its puzzles from
+WRITE_BATCH_SIZE = 1000 # Rows per transaction for bulk writes
+
+# One played (or abandoned) game; times are Unix timestamps, ended_at and solve_seconds are
+# None while it is in progress, and solve_seconds stays None unless the player solved it
+SessionRecord = namedtuple("SessionRecord", "session_id username puzzle_id difficulty puzzle solution "
+                                            "started_at ended_at wrong_attempts hints_used solved solve_seconds")
+# One input in a session, numbered from 1 by seq; kind is "place", "delete", "hint" or "solve"
+# (value is 0 for deletions and for "solve", which fills the whole board)
+MoveRecord = namedtuple("MoveRecord", "session_id seq at kind cell_row cell_col value")
+
+
+class StorageError(Exception):
+    """A backend failed to run a query; wraps the driver's own exception."""
+
+
+class Storage:
+    """
+    Queries shared by every backend, written once with "?" placeholders.
+
+    Subclasses set placeholder and integrity_errors for their driver and implement
+    _run(work), which calls work(cursor) inside a transaction, commits it and
+    returns work's result, rolling back and raising StorageError on failure.
+    """
+    placeholder = "?"
+    integrity_errors = ()
+
+    def _run(self, work):
+        raise NotImplementedError
+
+    def _sql(self, sql):
+        return sql if self.placeholder == "?" else sql.replace("?", self.placeholder)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Accounts
+
+    def get_password_hash(self, username):
+        """Returns the stored password hash for username, or None if there is no such account."""
+        sql = self._sql("SELECT password_hash FROM login WHERE username = ?")
+        def work(cursor):
+            cursor.execute(sql, (username,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+        return self._run(work)
+
+    def set_password_hash(self, username, password_hash):
+        sql = self._sql("UPDATE login SET password_hash = ? WHERE username = ?")
+        self._run(lambda cursor: cursor.execute(sql, (password_hash, username)))
+
+    def add_user(self, username, password_hash):
+        """Inserts an account and returns True, or False if the username is already taken."""
+        sql = self._sql("INSERT INTO login (username, password_hash) VALUES (?, ?)")
+        def work(cursor):
+            try:
+                cursor.execute(sql, (username, password_hash))
+            except self.integrity_errors:
+                return False
+            return True
+        return self._run(work)
+
+    # Game sessions
+
+    def save_sessions(self, sessions):
+        """Inserts or replaces SessionRecords, WRITE_BATCH_SIZE per transaction."""
+        sql = self._sql(f"REPLACE INTO game_sessions ({', '.join(SessionRecord._fields)}) "
+                        f"VALUES ({', '.join('?' * len(SessionRecord._fields))})")
+        for batch in _batches(sessions):
+            self._run(lambda cursor: cursor.executemany(sql, batch))
+
+    def recent_sessions(self, username, limit=10):
+        """The user's last limit SessionRecords, newest first."""
+        sql = self._sql(f"SELECT {', '.join(SessionRecord._fields)} FROM game_sessions "
+                        "WHERE username = ? ORDER BY started_at DESC LIMIT ?")
+        def work(cursor):
+            cursor.execute(sql, (username, limit))
+            return [SessionRecord(*row)._replace(solved=bool(row[10])) for row in cursor.fetchall()]
+        return self._run(work)
+
+    def save_moves(self, moves):
+        """Inserts or replaces MoveRecords, WRITE_BATCH_SIZE per transaction."""
+        sql = self._sql(f"REPLACE INTO game_moves ({', '.join(MoveRecord._fields)}) "
+                        f"VALUES ({', '.join('?' * len(MoveRecord._fields))})")
+        for batch in _batches(moves):
+            self._run(lambda cursor: cursor.executemany(sql, batch))
+
+    def session_moves(self, session_id):
+        """All MoveRecords of a session in the order they were made."""
+        sql = self._sql(f"SELECT {', '.join(MoveRecord._fields)} FROM game_moves "
+                        "WHERE session_id = ? ORDER BY seq")
+        def work(cursor):
+            cursor.execute(sql, (session_id,))
+            return [MoveRecord(*row) for row in cursor.fetchall()]
+        return self._run(work)
+
+    # Puzzle banks
+
+    def add_puzzles(self, entries):
+        """Stores (difficulty, full_board, puzzle, grade) entries, like write_puzzle_bank, in batched transactions."""
+        sql = self._sql("INSERT INTO puzzles (label, puzzle, solution, solved, steps) VALUES (?, ?, ?, ?, ?)")
+        rows = ((bank_label(difficulty), board_to_string(puzzle), board_to_string(full_board), grade.solved,
+                 json.dumps(grade.steps, separators=(",", ":")))
+                for difficulty, full_board, puzzle, grade in entries)
+        for batch in _batches(rows):
+            self._run(lambda cursor: cursor.executemany(sql, batch))
+
+    def puzzle_count(self, difficulty):
+        sql = self._sql("SELECT COUNT(*) FROM puzzles WHERE label = ?")
+        def work(cursor):
+            cursor.execute(sql, (bank_label(difficulty),))
+            return cursor.fetchone()[0]
+        return self._run(work)
+
+    def random_puzzle(self, difficulty, rng=random):
+        """
+        Returns a random (full_board, puzzle, grade) of difficulty, or None if none are stored.
+        Picks a random id in the label's range and seeks to it through the (label, id)
+        index, so the cost does not grow with the number of stored puzzles.
+        """
+        label = bank_label(difficulty)
+        bounds_sql = self._sql("SELECT MIN(id), MAX(id) FROM puzzles WHERE label = ?")
+        pick_sql = self._sql("SELECT solution, puzzle, solved, steps FROM puzzles "
+                             "WHERE label = ? AND id >= ? ORDER BY id LIMIT 1")
+        def work(cursor):
+            cursor.execute(bounds_sql, (label,))
+            low, high = cursor.fetchone()
+            if low is None:
+                return None
+            cursor.execute(pick_sql, (label, rng.randint(low, high)))
+            return cursor.fetchone()
+        row = self._run(work)
+        if row is None:
+            return None
+        return string_to_board(row[0]), string_to_board(row[1]), grade_from_steps(json.loads(row[3]), bool(row[2]))
+
+
+def _batches(rows, size=WRITE_BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class StoragePuzzleBank:
+    """Adapts a Storage to the PuzzleBank count()/random()/close() interface used by make_puzzle and the game."""
+    def __init__(self, storage):
+        self.storage = storage
+
+    def count(self, difficulty):
+        return self.storage.puzzle_count(difficulty)
+
+    def random(self, difficulty, rng=random):
+        return self.storage.random_puzzle(difficulty, rng)
+
+    def close(self):
+        self.storage.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_bank(location=PUZZLE_BANK):
+    """
+    Opens the bank at location, a bank file or DB_BANK for the puzzles table of
+    open_storage(); returns None if it is missing or the database is unreachable.
+    """
+    if location != DB_BANK:
+        return open_puzzle_bank(location)
+    try:
+        return StoragePuzzleBank(open_storage())
+    except (StorageError, ImportError): # ImportError: no mysql-connector for the MySQL backend
+        return None
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS login (
+    username TEXT PRIMARY KEY,
+    password_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS game_sessions (
+    session_id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    puzzle_id TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    puzzle TEXT NOT NULL,
+    solution TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    wrong_attempts INTEGER NOT NULL DEFAULT 0,
+    hints_used INTEGER NOT NULL DEFAULT 0,
+    solved INTEGER NOT NULL DEFAULT 0,
+    solve_seconds REAL
+);
+CREATE INDEX IF NOT EXISTS game_sessions_user ON game_sessions (username, started_at);
+CREATE TABLE IF NOT EXISTS game_moves (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    at REAL NOT NULL,
+    kind TEXT NOT NULL,
+    cell_row INTEGER NOT NULL,
+    cell_col INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+CREATE TABLE IF NOT EXISTS puzzles (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL,
+    puzzle TEXT NOT NULL,
+    solution TEXT NOT NULL,
+    solved INTEGER NOT NULL,
+    steps TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS puzzles_label ON puzzles (label, id);
+"""
+
+
+class SQLiteStorage(Storage):
+    """
+    Embedded backend in a single database file, created with its tables on first use.
+
+    The file is in WAL mode, so readers never wait for the writer, and with
+    synchronous=NORMAL a commit costs no fsync until checkpoint. Each thread gets its own
+    connection, whose statement cache keeps every query above compiled after first use.
+    """
+    integrity_errors = (sqlite3.IntegrityError,)
+
+    def __init__(self, path=SQLITE_PATH, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._connect().executescript(SQLITE_SCHEMA)
+
+    def _connect(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+            self._connections.append(con)
+        return con
+
+    def _run(self, work):
+        try:
+            con = self._connect()
+            with con: # Commits on success, rolls back on an exception
+                return work(con.cursor())
+        except sqlite3.Error as err:
+            raise StorageError(str(err)) from err
+
+    def close(self):
+        for con in self._connections:
+            con.close()
+        self._connections.clear()
+        self._local = threading.local()
+
+
+def open_storage(backend=STORAGE_BACKEND, **options):
+    """Opens the named backend ("mysql" or "sqlite"), passing options to its constructor."""
+    if backend == "sqlite":
+        return SQLiteStorage(**options)
+    if backend == "mysql":
+        from sudogen_mysql import MySQLStorage # mysql-connector is only needed for this backend
+        return MySQLStorage(**options)
+    raise ValueError(f"Unknown storage backend {backend!r}; expected 'mysql' or 'sqlite'")
+
+
+def check_login(storage, username, password):
+    """
+    True if username exists and password matches its stored hash.
+
+    Hashing is deliberately slow, so call this off the UI thread. A hash made with an
+    older cost setting is replaced after a successful login.
+    """
+    stored = storage.get_password_hash(username)
+    if stored is None:
+        return dummy_verify(password)
+    if not verify_password(password, stored):
+        return False
+    if needs_rehash(stored):
+        storage.set_password_hash(username, hash_password(password))
+    return True
+
+
+def create_user(storage, username, password):
+    """
+    Inserts a new account and returns True, or False if the username is taken.
+
+    The primary key on username does the uniqueness check, so there is no separate
+    lookup that another client could race between.
+    """
+    return storage.add_user(username, hash_password(password))
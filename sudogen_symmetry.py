@@ -0,0 +1,235 @@
+"""Sudoku symmetry transforms, canonical (minlex) forms and a duplicate index."""
+import hashlib
+import os
+import random
+from collections import namedtuple
+from itertools import permutations, product
+from operator import itemgetter
+
+from sudogen_core import GRID_SIZE
+
+# --- Symmetry Transforms ---
+# Relabelling digits, permuting rows within bands and bands themselves, the same for
+# columns and stacks, and transposing all map a valid grid to a valid grid, and a
+# puzzle with one solution to a puzzle with one solution.
+
+SudokuTransform = namedtuple("SudokuTransform", ["digits", "rows", "cols", "transpose"])
+
+def _random_line_order(rng):
+    """Random order of the 9 rows (or columns) that keeps each band (or stack) together."""
+    bands = [0, 1, 2]
+    rng.shuffle(bands)
+    order = []
+    for band in bands:
+        lines = [band * 3, band * 3 + 1, band * 3 + 2]
+        rng.shuffle(lines)
+        order.extend(lines)
+    return order
+
+def random_transform(rng=random):
+    """Draws a random symmetry; digits[0] stays 0 so blanks stay blank."""
+    digits = list(range(1, GRID_SIZE + 1))
+    rng.shuffle(digits)
+    return SudokuTransform([0] + digits, _random_line_order(rng), _random_line_order(rng), rng.random() < 0.5)
+
+def apply_transform(board, transform):
+    """Returns the board seen through transform: row r of the result is source row transform.rows[r]."""
+    digits = transform.digits
+    if transform.transpose:
+        board = [list(col) for col in zip(*board)]
+    return [[digits[board[r][c]] for c in transform.cols] for r in transform.rows]
+
+def derive_variants(full_board, puzzle, count, rng=random):
+    """
+    Yields count (full_board, puzzle) pairs equivalent to the given pair, each under a
+    fresh random transform; the blank pattern moves with the grid, so uniqueness carries over.
+    """
+    for _ in range(count):
+        transform = random_transform(rng)
+        yield apply_transform(full_board, transform), apply_transform(puzzle, transform)
+
+# --- Canonical Form and Duplicate Detection ---
+# The canonical form of a grid or puzzle is its minimum-lexicographic equivalent
+# (row by row, blanks as 0) over all symmetry transforms and digit relabellings.
+# It is found row by row, keeping only the partial transforms that tie for the
+# smallest row so far, instead of trying all 3,359,232 transforms. Ties that can
+# only go on the same way (empty rows taken in another order, columns that look
+# alike) are merged, so sparse and very symmetric boards do not multiply them.
+
+# Every stack-preserving order of the 9 columns (6 stack orders x 6^3 within stacks)
+COLUMN_ORDERS = [tuple(stack * 3 + k for stack, inner in zip(stacks, inners) for k in inner)
+                 for stacks in permutations(range(3))
+                 for inners in product(permutations(range(3)), repeat=3)]
+
+def _next_rows(rows):
+    """Source rows that may come next after the rows already placed, keeping bands together."""
+    if len(rows) % 3:
+        band = rows[-1] // 3
+        return [r for r in range(band * 3, band * 3 + 3) if r not in rows]
+    used = {r // 3 for r in rows}
+    return [r for r in range(GRID_SIZE) if r // 3 not in used]
+
+def _first_row_states(sources):
+    """States (source, rows, column order, labels, last label) tying for the smallest first row."""
+    # With distinct digits the relabelled first row depends only on where its blanks are,
+    # and it is smallest when the emptiest stacks and the blanks inside them come first.
+    best, starts = None, []
+    for s, source in enumerate(sources):
+        for r, row in enumerate(source):
+            blanks = sorted((row[k:k + 3].count(0) for k in range(0, GRID_SIZE, 3)), reverse=True)
+            pattern = tuple(cell for count in blanks for cell in [0] * count + [1] * (3 - count))
+            if best is None or pattern < best: best, starts = pattern, []
+            if pattern == best: starts.append((s, r))
+    states = []
+    for s, r in starts:
+        row = sources[s][r]
+        for order in COLUMN_ORDERS:
+            values = [row[c] for c in order]
+            if tuple(1 if v else 0 for v in values) != best: continue
+            labels = [0] * (GRID_SIZE + 1)
+            last = 0
+            for v in values:
+                if v:
+                    last += 1
+                    labels[v] = last
+            states.append((s, (r,), order, labels, last))
+    return states
+
+def _min_conjugate_orders(sigma):
+    """
+    For two full rows of one band, where sigma[c] is the column of row 0 holding the digit
+    that row 1 has in column c, finds the column orders P that make row 1 smallest once
+    row 0 is relabelled to 1..9. Row 1 then reads P^-1(sigma(P(j))) + 1, so slots are
+    assigned left to right and the slot a value points at is forced to the smallest free one.
+    """
+    states = [([-1] * GRID_SIZE, [-1] * GRID_SIZE, [-1] * 3)] # order, inverse order, slot stack -> column stack
+    sequence = []
+    for j in range(GRID_SIZE):
+        best, survivors = None, []
+        for order, inverse, stacks in states:
+            if order[j] >= 0:
+                choices = (order[j],)
+            elif stacks[j // 3] >= 0:
+                base = stacks[j // 3] * 3
+                choices = [c for c in range(base, base + 3) if inverse[c] < 0]
+            else:
+                choices = [c for c in range(GRID_SIZE) if inverse[c] < 0 and c // 3 not in stacks]
+            for c in choices:
+                order2, inverse2, stacks2 = order[:], inverse[:], stacks[:]
+                order2[j], inverse2[c], stacks2[j // 3] = c, j, c // 3
+                target = sigma[c]
+                value = inverse2[target]
+                if value < 0:
+                    stack = stacks2.index(target // 3) if target // 3 in stacks2 else stacks2.index(-1)
+                    value = next(m for m in range(stack * 3, stack * 3 + 3) if order2[m] < 0)
+                    order2[value], inverse2[target], stacks2[stack] = target, value, target // 3
+                if best is None or value < best: best, survivors = value, []
+                if value == best: survivors.append((order2, inverse2, stacks2))
+        states = survivors
+        sequence.append(best + 1)
+    return sequence, [tuple(order) for order, _, _ in states]
+
+def _full_grid_states(sources):
+    """States tying for the smallest first two rows of a completely filled grid (first row is always 1..9)."""
+    best, states = None, []
+    for s, source in enumerate(sources):
+        for r0, row0 in enumerate(source):
+            where = [0] * (GRID_SIZE + 1)
+            for c, v in enumerate(row0): where[v] = c
+            for r1 in _next_rows((r0,)):
+                sequence, orders = _min_conjugate_orders([where[v] for v in source[r1]])
+                if best is None or sequence < best: best, states = sequence, []
+                if sequence == best:
+                    for order in orders:
+                        labels = [0] * (GRID_SIZE + 1)
+                        for j, c in enumerate(order): labels[row0[c]] = j + 1
+                        states.append((s, (r0, r1), order, labels, GRID_SIZE))
+    return states
+
+def _merge_states(sources, states):
+    """
+    Keeps one of each group of states that can only end the same way: the rows still to
+    place, seen through the state's column order and grouped by band, and the labels match.
+    """
+    merged = {}
+    for state in states:
+        s, rows, order, labels, last = state
+        source = sources[s]
+        view = itemgetter(*order) # A source row as this state reads it
+        band = tuple(sorted(view(source[r]) for r in _next_rows(rows))) if len(rows) % 3 else ()
+        placed = {r // 3 for r in rows}
+        bands = tuple(sorted(tuple(sorted(map(view, source[b * 3:b * 3 + 3]))) for b in range(3) if b not in placed))
+        merged.setdefault((band, bands, tuple(labels)), state)
+    return list(merged.values())
+
+def canonical_form(board):
+    """Returns the minimum-lexicographic equivalent of a grid or puzzle as an 81-character string."""
+    sources = [[list(row) for row in board], [list(col) for col in zip(*board)]]
+    if all(num != 0 for row in board for num in row):
+        states = _full_grid_states(sources)
+    else:
+        states = _first_row_states(sources)
+        # Several tying first rows (e.g. empty ones) are where sparse boards start to multiply
+        if len({state[:2] for state in states}) > 1: states = _merge_states(sources, states)
+    # Extend every surviving state by one row at a time, keeping only those that tie for the smallest row
+    while len(states[0][1]) < GRID_SIZE:
+        best, survivors = None, []
+        for s, rows, order, labels, last in states:
+            source = sources[s]
+            for r in _next_rows(rows):
+                row = source[r]
+                new_labels, new_last, key = labels[:], last, []
+                for c in order:
+                    v = row[c]
+                    if v and not new_labels[v]:
+                        new_last += 1
+                        new_labels[v] = new_last
+                    key.append(new_labels[v])
+                if best is None or key < best: best, survivors = key, []
+                if key == best: survivors.append((s, rows + (r,), order, new_labels, new_last))
+        states = _merge_states(sources, survivors) if len(survivors) > len(states) else survivors
+    s, rows, order, labels, _ = states[0]
+    return "".join(str(labels[sources[s][r][c]]) for r in rows for c in order)
+
+class CanonicalIndex:
+    """
+    Set of canonical-form digests used to reject puzzles that are symmetric duplicates
+    of ones already seen. With a path, digests are appended to that file and reloaded
+    on the next run, so dedup carries across batches.
+    """
+    DIGEST_SIZE = 16
+
+    def __init__(self, path=None):
+        self.path = path
+        self.seen = set()
+        self._file = None
+        if path is not None:
+            if os.path.exists(path):
+                with open(path, "rb") as existing:
+                    while True:
+                        digest = existing.read(self.DIGEST_SIZE)
+                        if len(digest) < self.DIGEST_SIZE: break # A torn final write is dropped
+                        self.seen.add(digest)
+            self._file = open(path, "ab")
+
+    def digest(self, canonical):
+        return hashlib.blake2b(canonical.encode("ascii"), digest_size=self.DIGEST_SIZE).digest()
+
+    def add(self, canonical):
+        """Records a canonical form; returns False if it was already present."""
+        digest = self.digest(canonical)
+        if digest in self.seen: return False
+        self.seen.add(digest)
+        if self._file is not None: self._file.write(digest)
+        return True
+
+    def __contains__(self, canonical):
+        return self.digest(canonical) in self.seen
+
+    def __len__(self):
+        return len(self.seen)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,82 @@
+"""Vectorized validation of many boards at once. Needs NumPy."""
+from collections import namedtuple
+
+from sudogen_core import GRID_SIZE
+
+np = None # NumPy, imported on first use so importing this module stays cheap
+
+# --- Bulk Board Validation (NumPy) ---
+# Vectorized counterparts of is_valid, Grid.calculate_correct_count and the is_filled
+# check, for arrays of shape (N, 9, 9). Boards are processed in chunks to bound memory.
+
+BoardChecks = namedtuple("BoardChecks", ["consistent", "solved", "matches"])
+
+def _as_board_array(boards):
+    global np
+    if np is None:
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("Bulk validation needs NumPy (pip install numpy)") from None
+    boards = np.asarray(boards)
+    if boards.ndim != 3 or boards.shape[1:] != (GRID_SIZE, GRID_SIZE):
+        raise ValueError(f"Expected an array of shape (N, {GRID_SIZE}, {GRID_SIZE}), got {boards.shape}")
+    if boards.dtype.kind not in "iub":
+        raise ValueError(f"Expected integer boards, got {boards.dtype}")
+    # Narrow to int8 only when every value fits; out-of-range boards keep a wide type so
+    # boards_consistent sees the real values and marks them invalid instead of wrapping
+    if boards.size and (boards.min() < 0 or boards.max() > GRID_SIZE):
+        return boards.astype(np.int64, copy=False)
+    return boards.astype(np.int8, copy=False)
+
+def _units(boards):
+    """(N, 27, 9) view of every row, column and box of each board."""
+    n = boards.shape[0]
+    boxes = boards.reshape(n, 3, 3, 3, 3).transpose(0, 1, 3, 2, 4).reshape(n, GRID_SIZE, GRID_SIZE)
+    return np.concatenate([boards, boards.transpose(0, 2, 1), boxes], axis=1)
+
+def boards_consistent(boards):
+    """True for each board whose digits are 0-9 and repeat in no row, column or box (blanks allowed)."""
+    boards = _as_board_array(boards)
+    units = np.sort(_units(boards), axis=2)
+    repeated = (units[:, :, 1:] == units[:, :, :-1]) & (units[:, :, 1:] != 0)
+    in_range = ((boards >= 0) & (boards <= GRID_SIZE)).all(axis=(1, 2))
+    return in_range & ~repeated.any(axis=(1, 2))
+
+def boards_solved(boards):
+    """True for each board that is a complete, valid solution."""
+    boards = _as_board_array(boards)
+    return (boards != 0).all(axis=(1, 2)) & boards_consistent(boards)
+
+def boards_match(boards, solutions):
+    """True for each board identical to its solution."""
+    boards, solutions = _as_board_array(boards), _as_board_array(solutions)
+    return (boards == solutions).all(axis=(1, 2))
+
+def correct_counts(answers, initial_boards, solutions):
+    """Per board, how many non-initial cells hold the solution digit (Grid.calculate_correct_count)."""
+    answers, initial_boards = _as_board_array(answers), _as_board_array(initial_boards)
+    solutions = _as_board_array(solutions)
+    return ((answers != 0) & (initial_boards == 0) & (answers == solutions)).sum(axis=(1, 2))
+
+def check_boards(boards, solutions=None, chunk_size=100000):
+    """
+    Runs boards_consistent, boards_solved and (if solutions are given) boards_match
+    chunk by chunk, returning a BoardChecks of boolean arrays; matches is None
+    without solutions.
+    """
+    boards = _as_board_array(boards)
+    if solutions is not None:
+        solutions = _as_board_array(solutions)
+        if solutions.shape != boards.shape:
+            raise ValueError(f"boards {boards.shape} and solutions {solutions.shape} differ in shape")
+    consistent = np.empty(len(boards), dtype=bool)
+    solved = np.empty(len(boards), dtype=bool)
+    matches = np.empty(len(boards), dtype=bool) if solutions is not None else None
+    for start in range(0, len(boards), chunk_size):
+        part = slice(start, start + chunk_size)
+        consistent[part] = boards_consistent(boards[part])
+        solved[part] = consistent[part] & (boards[part] != 0).all(axis=(1, 2))
+        if solutions is not None:
+            matches[part] = boards_match(boards[part], solutions[part])
+    return BoardChecks(consistent, solved, matches)
@@ -0,0 +1,28 @@
+"""Bank files: what the bank command stores and what make_puzzle reads back."""
+import random
+
+from sudogen_bank import PuzzleBank, pack_puzzle, unpack_puzzle
+from sudogen_batch import bank_main
+from sudogen_core import generate_graded_puzzle, grade_puzzle, make_puzzle
+
+
+def test_record_keeps_the_grade():
+    for band in ("easy", "extreme"):
+        full_board, puzzle, grade = generate_graded_puzzle(band, rng=random.Random(2))
+        assert unpack_puzzle(pack_puzzle(full_board, puzzle, grade)) == (full_board, puzzle, grade)
+
+
+def test_puzzles_filed_by_graded_band(tmp_path, capsys):
+    path = str(tmp_path / "puzzles.sgpb")
+    assert bank_main([path, "-n", "4", "-d", "hard", "-d", "30", "-w", "2", "--seed", "5"]) == 0
+    assert "Wrote 8 puzzles" in capsys.readouterr().err
+    with PuzzleBank(path) as bank:
+        assert sum(bank.count(label) for label in bank.labels()) == 8
+        assert bank.count(30) == 4
+        for label in bank.labels():
+            for k in range(bank.count(label)):
+                full_board, puzzle, grade = bank.get(label, k)
+                assert grade == grade_puzzle(puzzle)
+                if label != "30": assert grade.band == label
+        random.seed(1)
+        assert make_puzzle(30, bank) == bank.get(30, random.Random(1).randrange(4))
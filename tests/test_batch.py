@@ -0,0 +1,41 @@
+"""Batch generation on a process pool."""
+import random
+
+from sudogen_batch import _generate_batch_chunk, generate_batch
+from sudogen_symmetry import CanonicalIndex
+
+
+def records(**kwargs):
+    return sorted(((r["index"], r["puzzle"]) for r in generate_batch(6, "easy", seed=11, **kwargs)))
+
+
+def test_seeded_batch_ignores_how_work_is_split():
+    one = records(workers=1)
+    assert len(one) == 6
+    assert records(workers=2) == one
+    assert records(workers=3, chunk_size=1) == one
+
+
+def test_variants_ignore_how_work_is_split():
+    assert records(workers=2, variants_per_seed=3) == records(workers=1, variants_per_seed=3, chunk_size=50)
+
+
+def test_dedup_skips_puzzles_already_seen():
+    index = CanonicalIndex()
+    first = records(workers=2, dedup=index)
+    again = records(workers=2, dedup=index) # Same seed: its first puzzles are all duplicates
+    assert len(first) == len(again) == 6
+    assert not {puzzle for _, puzzle in first} & {puzzle for _, puzzle in again}
+    assert len(index) == 12
+
+
+def test_chunk_leaves_global_random_alone():
+    def chunk():
+        return [{k: v for k, v in record.items() if k != "elapsed_ms"}
+                for record in _generate_batch_chunk(0, 4, "easy", 11, variants_per_seed=2)]
+    random.seed(1)
+    state = random.getstate()
+    first = chunk()
+    assert random.getstate() == state
+    random.seed(2)
+    assert chunk() == first
@@ -0,0 +1,151 @@
+"""GridState's running counts, candidate grid and flat boards against a full recompute."""
+import random
+
+import pytest
+
+from sudogen_core import GridState, _geometry, board_to_bytes, bytes_to_board, make_puzzle
+
+
+def recompute(state):
+    """(filled, correct, conflicts, candidates) of state worked out from its boards alone."""
+    size = state.size
+    _, units, _, peers = _geometry(state.box)
+    value = [state.initial_board[r][c] or state.user_answers[r][c] for r in range(size) for c in range(size)]
+    solution = [num for row in state.full_board for num in row]
+    given = [num for row in state.initial_board for num in row]
+    filled = sum(1 for v in value if v)
+    correct = sum(1 for i, v in enumerate(value) if v and not given[i] and v == solution[i])
+    conflicts = sum(max(0, [value[i] for i in unit].count(d) - 1) for unit in units for d in range(1, size + 1))
+    cands = []
+    for i in range(size * size):
+        if value[i]:
+            cands.append(0)
+            continue
+        seen = {value[p] for p in peers[i]}
+        cands.append(sum(1 << (d - 1) for d in range(1, size + 1) if d not in seen))
+    return filled, correct, conflicts, cands
+
+
+def assert_consistent(state):
+    filled, correct, conflicts, cands = recompute(state)
+    assert state.filled_count == filled
+    assert state.correct_count == correct == state.calculate_correct_count()
+    assert state.conflicts == conflicts
+    assert list(state.cands) == cands
+
+
+def play(state, rng, moves):
+    """Random places, deletions and hints on the blanks, game over or not."""
+    size = state.size
+    blanks = [(r, c) for r in range(size) for c in range(size) if state.initial_board[r][c] == 0]
+    for _ in range(moves):
+        state.game_over = False
+        state.wrong_attempts = 0
+        state.select_cell(*rng.choice(blanks))
+        roll = rng.random()
+        if roll < 0.3:
+            state.delete_number()
+        elif roll < 0.35:
+            state.hint()
+        else:
+            state.place_number(rng.randint(1, size))
+
+
+@pytest.mark.parametrize("box_size", [2, 3, 4])
+def test_incremental_state_matches_recompute(box_size):
+    rng = random.Random(box_size)
+    random.seed(box_size)
+    state = GridState(puzzle=make_puzzle("medium", box_size=box_size))
+    assert_consistent(state)
+    play(state, rng, 500)
+    assert_consistent(state)
+
+
+def test_completion():
+    random.seed(5)
+    state = GridState(puzzle=make_puzzle(45))
+    blanks = [(r, c) for r in range(9) for c in range(9) if state.initial_board[r][c] == 0]
+    full_board = state.full_board
+    for r, c in blanks[:-1]:
+        state.select_cell(r, c)
+        state.place_number(full_board[r][c])
+    assert not state.game_over
+    r, c = blanks[-1]
+    state.select_cell(r, c)
+    state.place_number(full_board[r][c] % 9 + 1)
+    assert not state.game_over and state.filled_count == 81
+    state.place_number(full_board[r][c])
+    assert state.game_over and state.correct_count == state.total_blanks == 45
+    assert_consistent(state)
+
+
+def test_solving_by_hints():
+    random.seed(9)
+    state = GridState(puzzle=make_puzzle("hard"))
+    for _ in range(81):
+        if state.game_over: break
+        assert state.next_step().technique is not None # A hard puzzle never needs a guess
+        state.hint()
+    assert state.game_over
+    assert state.correct_count == state.total_blanks
+    assert state.user_answers == [[0 if given else num for given, num in zip(g_row, s_row)]
+                                  for g_row, s_row in zip(state.initial_board, state.full_board)]
+    assert_consistent(state)
+
+
+def test_hint_corrects_a_mistake_first():
+    random.seed(10)
+    state = GridState(puzzle=make_puzzle(45))
+    r, c = next((r, c) for r in range(9) for c in range(9) if state.initial_board[r][c] == 0)
+    state.select_cell(r, c)
+    state.place_number(state.full_board[r][c] % 9 + 1)
+    step = state.next_step()
+    assert (step.technique, step.row, step.col, step.digit) == ("mistake", r, c, state.full_board[r][c])
+    state.hint()
+    assert state.user_answers[r][c] == state.full_board[r][c] and state.hint_mask[r][c] == 1
+
+
+def test_analysis_built_after_moves():
+    # Counts and candidates are only built on first use; moves made before must be reflected
+    rng = random.Random(7)
+    random.seed(7)
+    state = GridState(puzzle=make_puzzle(45))
+    blanks = [(r, c) for r in range(9) for c in range(9) if state.initial_board[r][c] == 0]
+    for r, c in rng.sample(blanks, 20):
+        state.wrong_attempts = 0
+        state.select_cell(r, c)
+        state.place_number(rng.randint(1, 9))
+    assert state._cands is None
+    assert_consistent(state)
+
+
+def test_copy_is_independent():
+    rng = random.Random(8)
+    random.seed(8)
+    state = GridState(puzzle=make_puzzle(45))
+    play(state, rng, 40)
+    other = state.copy()
+    assert other.user_answers == state.user_answers
+    assert other.recorder is None
+    play(other, rng, 200)
+    assert_consistent(state)
+    assert_consistent(other)
+    answers, cands = other.user_answers, list(other.cands)
+    play(state, rng, 200)
+    assert_consistent(state)
+    assert other.user_answers == answers
+    assert list(other.cands) == cands
+    assert other.solution is state.solution # The puzzle itself is shared
+
+
+def test_boards_as_bytes():
+    random.seed(10)
+    full_board, puzzle, grade = make_puzzle(45)
+    assert bytes_to_board(board_to_bytes(puzzle)) == puzzle
+    from_lists = GridState(puzzle=(full_board, puzzle, grade))
+    from_bytes = GridState(puzzle=(board_to_bytes(full_board), board_to_bytes(puzzle), grade))
+    assert from_bytes.initial_board == from_lists.initial_board == puzzle
+    assert from_bytes.full_board == full_board
+    assert from_bytes.hint_mask == [[0] * 9 for _ in range(9)]
+    with pytest.raises(ValueError):
+        GridState(puzzle=(bytes(80), bytes(80), None))
@@ -0,0 +1,21 @@
+"""The technique grader and band-targeted generation."""
+import random
+
+import pytest
+
+from sudogen_core import DIFFICULTY_BANDS, generate_graded_puzzle, grade_puzzle, has_unique_solution
+
+
+@pytest.mark.parametrize("band", [name for name, _ in DIFFICULTY_BANDS])
+def test_each_band_is_hit_within_its_attempts(band):
+    full_board, puzzle, grade = generate_graded_puzzle(band, rng=random.Random(0))
+    assert grade.band == band
+    assert grade == grade_puzzle(puzzle)
+    assert all(puzzle[r][c] in (0, full_board[r][c]) for r in range(9) for c in range(9))
+    assert has_unique_solution(puzzle)
+
+
+def test_full_board_needs_no_technique():
+    full_board, _, _ = generate_graded_puzzle("easy", rng=random.Random(1))
+    grade = grade_puzzle(full_board)
+    assert (grade.band, grade.score, grade.hardest, grade.solved) == ("easy", 0, None, True)
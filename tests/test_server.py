@@ -0,0 +1,69 @@
+"""The puzzle server's status codes and its limits on seeded generation."""
+import asyncio
+import json
+
+from sudogen_cache import PuzzleCache
+from sudogen_server import PuzzleServer
+
+
+async def fetch(port, path, extra=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nConnection: close\r\n{extra}\r\n".encode("latin-1"))
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, json.loads(body)
+
+
+def run_server(check, **options):
+    async def main():
+        server = PuzzleServer(difficulties=(), workers=1, cache=PuzzleCache(), **options)
+        port = (await server.start(port=0)).sockets[0].getsockname()[1]
+        try:
+            await check(server, port)
+        finally:
+            await server.close()
+    asyncio.run(main())
+
+
+def test_status_codes():
+    async def check(server, port):
+        async def broken(params):
+            int("x") # A ValueError from a bug, not from the request
+        server.routes["/broken"] = broken
+        assert (await fetch(port, "/broken"))[::2] == (500, {"error": "internal server error"})
+        assert (await fetch(port, "/stats", "Content-Length: ten\r\n"))[0] == 400
+        assert (await fetch(port, "/puzzle?id=medium:10:1"))[0] == 400
+        assert (await fetch(port, "/puzzle?difficulty=impossible"))[0] == 400
+        assert (await fetch(port, "/nowhere"))[0] == 404
+        assert (await fetch(port, "/stats"))[0] == 200
+    run_server(check)
+
+
+def test_seeded_generation_is_bounded():
+    async def check(server, port):
+        server.generating["expert:9:0"] = asyncio.get_running_loop().create_future() # The one worker is busy
+        status, headers, _ = await fetch(port, "/puzzle?id=easy:9:1")
+        assert status == 503 and headers["Retry-After"] == "1"
+        del server.generating["expert:9:0"]
+        first, again = await asyncio.gather(fetch(port, "/puzzle?id=easy:9:1"), fetch(port, "/puzzle?id=easy:9:1"))
+        assert first[0] == again[0] == 200 and first[2] == again[2]
+        server.max_waiting = 0
+        assert (await fetch(port, "/puzzle?id=easy:9:2"))[0] == 503
+        assert (await fetch(port, "/puzzle?id=easy:9:1"))[0] == 200 # Cached, so never waits
+        stats = (await fetch(port, "/stats"))[2]
+        assert stats["seeded"] == {"generating": 0, "waiting": 0, "refused": 2}
+    run_server(check, wait_timeout=60)
+
+
+def test_seeded_puzzle_cached_after_every_wait_times_out():
+    async def check(server, port):
+        status, _, _ = await fetch(port, "/puzzle?id=hard:9:3")
+        assert status == 503 # Gave up waiting; the generation carries on
+        while server.generating:
+            await asyncio.sleep(0.05)
+        assert server.cache.lookup("hard:9:3") is not None
+        assert (await fetch(port, "/puzzle?id=hard:9:3"))[0] == 200
+    run_server(check, wait_timeout=0.001)
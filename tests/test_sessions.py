@@ -0,0 +1,116 @@
+"""The session writer's journal and the game history read back from SQLite."""
+import os
+import subprocess
+import sys
+import textwrap
+
+import sudogen_sessions
+from sudogen_sessions import SessionWriter, history_main
+from sudogen_storage import MoveRecord, SessionRecord, SQLiteStorage, StorageError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUIET = {"flush_interval": 3600, "batch_size": 10 ** 6} # Nothing is committed until flush() or close()
+
+
+def session(session_id, ended_at=None):
+    return SessionRecord(session_id, "alice", "medium:9:1", "medium", "0" * 81, "1" * 81, 1000.0, ended_at,
+                         0, 0, ended_at is not None, None if ended_at is None else ended_at - 1000)
+
+
+def moves(session_id, count):
+    return [MoveRecord(session_id, seq, 1000.0 + seq, "place", seq % 9, seq // 9, 5) for seq in range(1, count + 1)]
+
+
+def journal_lines(path):
+    with open(path, encoding="utf-8") as journal:
+        return journal.read().splitlines()
+
+
+def test_killed_writer_is_replayed(tmp_path):
+    db, journal = str(tmp_path / "game.db"), str(tmp_path / "journal")
+    # A writer killed with its records still queued, as by a crash: nothing is flushed or closed
+    subprocess.run([sys.executable, "-c", textwrap.dedent(f"""
+        import os, sys
+        sys.path.insert(0, {ROOT!r})
+        from tests.test_sessions import QUIET, moves, session
+        from sudogen_sessions import SessionWriter
+        from sudogen_storage import SQLiteStorage
+        writer = SessionWriter(SQLiteStorage({db!r}), {journal!r}, **QUIET)
+        writer.put(session("a"))
+        for move in moves("a", 30): writer.put(move)
+        writer.put(session("a", ended_at=1060.0))
+        os._exit(1)
+        """)], check=False)
+    assert len(journal_lines(journal)) == 32
+    with SQLiteStorage(db) as storage:
+        assert storage.recent_sessions("alice") == []
+        with SessionWriter(storage, journal, **QUIET):
+            pass
+        assert storage.recent_sessions("alice") == [session("a", ended_at=1060.0)]
+        assert storage.session_moves("a") == moves("a", 30)
+    assert not os.path.exists(journal)
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    journal = str(tmp_path / "journal")
+    with SQLiteStorage(str(tmp_path / "game.db")) as storage:
+        writer = SessionWriter(storage, journal, **QUIET)
+        for record in [session("a")] + moves("a", 3):
+            writer.put(record)
+        writer._journal.write('{"t":"m","r":["a",4,') # Cut off mid-write
+        writer._journal.flush()
+        recovered = SessionWriter(storage, journal, **QUIET)
+        assert recovered.pending() == 4
+        recovered.close()
+        assert storage.session_moves("a") == moves("a", 3)
+
+
+def test_flush_leaves_only_the_queue_in_the_journal(tmp_path):
+    journal = str(tmp_path / "journal")
+    with SQLiteStorage(str(tmp_path / "game.db")) as storage:
+        writer = SessionWriter(storage, journal, **QUIET)
+        writer.put(session("a"))
+        for move in moves("a", 5): writer.put(move)
+        assert writer.flush() and writer.pending() == 0
+        assert journal_lines(journal) == []
+        writer.put(session("a", ended_at=1010.0))
+        assert len(journal_lines(journal)) == 1
+        writer.close()
+        assert storage.recent_sessions("alice") == [session("a", ended_at=1010.0)]
+    assert not os.path.exists(journal)
+
+
+class FailingStorage:
+    def save_sessions(self, sessions):
+        raise StorageError("database is down")
+
+    save_moves = save_sessions
+
+
+def test_failed_flush_keeps_the_journal(tmp_path):
+    journal = str(tmp_path / "journal")
+    writer = SessionWriter(FailingStorage(), journal, **QUIET)
+    writer.put(session("a"))
+    for move in moves("a", 2): writer.put(move)
+    assert not writer.flush()
+    assert str(writer.last_error) == "database is down"
+    writer.close()
+    assert len(journal_lines(journal)) == 3
+    with SQLiteStorage(str(tmp_path / "game.db")) as storage:
+        SessionWriter(storage, journal, **QUIET).close()
+        assert storage.session_moves("a") == moves("a", 2)
+
+
+def test_history_command(tmp_path, monkeypatch, capsys):
+    db = str(tmp_path / "game.db")
+    with SQLiteStorage(db) as storage, SessionWriter(storage, str(tmp_path / "journal"), **QUIET) as writer:
+        writer.put(session("old", ended_at=1100.0))
+        writer.put(session("new")._replace(started_at=2000.0))
+        for move in moves("old", 3): writer.put(move)
+    monkeypatch.setattr(sudogen_sessions, "open_storage", lambda: SQLiteStorage(db))
+    assert history_main(["alice", "--moves"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert "in progress" in lines[0] and "solved in 100s" in lines[1]
+    assert len(lines) == 5 and lines[-1].split()[:3] == ["3", "3.0s", "place"]
+    assert history_main(["bob"]) == 0
+    assert capsys.readouterr().err == "No games recorded for bob\n"
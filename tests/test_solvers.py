@@ -0,0 +1,134 @@
+"""The solvers, against the rules and against each other."""
+import random
+
+import pytest
+
+import threading
+
+from sudogen_core import (BUDGET_EXCEEDED, CANCELLED, NO_SOLUTION, SOLVED, SOLVER_BACKENDS, SearchBudget,
+                          SearchCancelled, board_to_string, count_solutions, find_solutions, generate_full_board,
+                          is_valid, make_puzzle, solve, solve_bounded)
+
+BACKENDS = sorted(SOLVER_BACKENDS)
+
+
+def is_solution(board):
+    size = len(board)
+    for r in range(size):
+        for c in range(size):
+            num = board[r][c]
+            board[r][c] = 0
+            ok = 1 <= num <= size and is_valid(board, num, (r, c))
+            board[r][c] = num
+            if not ok: return False
+    return True
+
+
+def solution_set(board, backend):
+    return {board_to_string(solution) for solution in find_solutions(board, backend=backend)}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_full_boards_are_valid(seed):
+    random.seed(seed)
+    assert is_solution(generate_full_board())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_solve_restores_the_solution(seed):
+    random.seed(seed)
+    full_board, puzzle, _ = make_puzzle(50)
+    board = [row[:] for row in puzzle]
+    assert solve(board)
+    assert board == full_board
+
+
+def test_every_4x4_grid():
+    empty = [[0] * 4 for _ in range(4)]
+    grids = {backend: solution_set(empty, backend) for backend in BACKENDS}
+    for backend in BACKENDS:
+        assert len(grids[backend]) == 288
+        assert grids[backend] == grids[BACKENDS[0]]
+    assert all(is_solution([[int(ch) for ch in grid[r * 4:r * 4 + 4]] for r in range(4)]) for grid in grids["dlx"])
+
+@pytest.mark.parametrize("seed", range(5))
+def test_backends_agree_on_puzzles(seed):
+    random.seed(seed)
+    full_board, puzzle, _ = make_puzzle(50)
+    for backend in BACKENDS:
+        board = [row[:] for row in puzzle]
+        assert solve(board, backend)
+        assert board == full_board
+        assert count_solutions(puzzle, limit=2, backend=backend) == 1
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_backends_agree_on_many_solutions(seed):
+    # A full grid with a few rows blanked has many solutions; every backend must find the same ones
+    random.seed(seed)
+    board = generate_full_board()
+    for r in random.sample(range(9), 3):
+        board[r] = [0] * 9
+    for c in random.sample(range(9), 2):
+        for row in board:
+            row[c] = 0
+    found = {backend: solution_set(board, backend) for backend in BACKENDS}
+    assert len(found[BACKENDS[0]]) > 1
+    for backend in BACKENDS:
+        assert found[backend] == found[BACKENDS[0]]
+        assert all(is_solution([[int(ch) for ch in grid[r * 9:r * 9 + 9]] for r in range(9)]) for grid in found[backend])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_no_solution(backend):
+    board = [[0] * 9 for _ in range(9)]
+    board[0][:8] = range(1, 9)
+    board[1][8] = 9 # The only digit left for R1C9 is already in its column
+    assert count_solutions(board, backend=backend) == 0
+    assert not solve([row[:] for row in board], backend)
+
+
+@pytest.mark.parametrize("box_size", [2, 4])
+def test_other_sizes(box_size):
+    random.seed(box_size)
+    full_board = generate_full_board(box_size)
+    assert is_solution(full_board)
+    puzzle = [row[:] for row in full_board]
+    for r in range(len(puzzle)):
+        puzzle[r][r] = 0
+    for backend in BACKENDS:
+        board = [row[:] for row in puzzle]
+        assert solve(board, backend)
+        assert board == full_board
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_budget_stops_search(backend):
+    budget = SearchBudget(max_nodes=5)
+    assert count_solutions([[0] * 9 for _ in range(9)], budget=budget, backend=backend) < 10
+    assert budget.stopped == BUDGET_EXCEEDED
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_solve_bounded(backend):
+    random.seed(6)
+    full_board, puzzle, _ = make_puzzle(55)
+    result = solve_bounded(puzzle, max_nodes=100000, backend=backend)
+    assert result.status == SOLVED and result.board == full_board
+    assert puzzle != full_board # Solved a copy
+    broken = [[0] * 9 for _ in range(9)]
+    broken[0][:8] = range(1, 9)
+    broken[1][8] = 9
+    assert solve_bounded(broken, backend=backend).status == NO_SOLUTION
+    assert solve_bounded([[0] * 9 for _ in range(9)], max_nodes=3, backend=backend).status == BUDGET_EXCEEDED
+    cancel = threading.Event()
+    cancel.set()
+    # Cancellation is looked at every CHECK_INTERVAL nodes, well before an empty board is filled
+    assert solve_bounded([[0] * 9 for _ in range(9)], cancel=cancel, backend=backend).status == CANCELLED
+
+
+def test_cancelled_generation():
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(SearchCancelled):
+        make_puzzle("hard", cancel=cancel)
@@ -0,0 +1,60 @@
+"""The puzzles table of the SQLite backend as a bank for make_puzzle."""
+import random
+
+import sudogen_batch
+import sudogen_storage
+from sudogen_batch import bank_main
+from sudogen_core import generate_graded_puzzle, grade_puzzle, make_puzzle
+from sudogen_storage import DB_BANK, SQLiteStorage, StoragePuzzleBank, open_bank
+
+
+def graded(seed, bands=("easy", "hard")):
+    rng = random.Random(seed)
+    return [generate_graded_puzzle(band, rng=rng) for band in bands]
+
+
+def test_puzzles_round_trip(tmp_path):
+    puzzles = graded(1)
+    with SQLiteStorage(str(tmp_path / "game.db")) as storage:
+        storage.add_puzzles([("easy",) + puzzles[0], (40,) + puzzles[1]])
+        assert storage.puzzle_count("easy") == storage.puzzle_count(40) == 1
+        assert storage.puzzle_count("hard") == 0 and storage.random_puzzle("hard") is None
+        assert storage.random_puzzle("easy") == puzzles[0]
+        assert storage.random_puzzle(40) == puzzles[1]
+
+
+def test_random_puzzle_reaches_every_puzzle(tmp_path):
+    puzzles = graded(2, ["easy"] * 4)
+    with SQLiteStorage(str(tmp_path / "game.db")) as storage:
+        storage.add_puzzles([("easy",) + puzzle for puzzle in puzzles])
+        storage.add_puzzles([("medium",) + puzzles[0]]) # Another label's ids interleave
+        storage.add_puzzles([("easy",) + puzzles[3]])
+        random.seed(3)
+        drawn = [storage.random_puzzle("easy") for _ in range(200)]
+        assert all(puzzle in puzzles for puzzle in drawn)
+        assert len({str(puzzle) for puzzle in drawn}) == 4
+
+
+def test_make_puzzle_from_storage_bank(tmp_path):
+    puzzles = graded(4)
+    with StoragePuzzleBank(SQLiteStorage(str(tmp_path / "game.db"))) as bank:
+        bank.storage.add_puzzles([("easy",) + puzzles[0]])
+        assert make_puzzle("easy", bank) == puzzles[0]
+        assert bank.count("hard") == 0
+        _, puzzle, grade = make_puzzle("hard", bank) # Not in the bank, so generated
+        assert grade == grade_puzzle(puzzle)
+
+
+def test_bank_command_fills_the_database(tmp_path, monkeypatch, capsys):
+    db = str(tmp_path / "game.db")
+    monkeypatch.setattr(sudogen_batch, "open_storage", lambda: SQLiteStorage(db))
+    monkeypatch.setattr(sudogen_storage, "open_storage", lambda: SQLiteStorage(db))
+    assert bank_main([DB_BANK, "-n", "3", "-d", "easy", "-w", "1", "--seed", "6"]) == 0
+    assert "Wrote 3 puzzles (3 easy) to db:" in capsys.readouterr().err
+    bank = open_bank(DB_BANK)
+    try:
+        assert bank.count("easy") == 3
+        _, puzzle, grade = make_puzzle("easy", bank)
+        assert grade.band == "easy" and grade == grade_puzzle(puzzle)
+    finally:
+        bank.close()
@@ -0,0 +1,82 @@
+"""Symmetry transforms, canonical forms and the duplicate index."""
+import random
+import time
+
+import pytest
+
+from sudogen_core import generate_full_board, has_unique_solution, make_puzzle
+from sudogen_symmetry import CanonicalIndex, apply_transform, canonical_form, derive_variants, random_transform
+
+
+def sparse_board(full_board, clues, rng):
+    board = [[0] * 9 for _ in range(9)]
+    for i in rng.sample(range(81), clues):
+        board[i // 9][i % 9] = full_board[i // 9][i % 9]
+    return board
+
+
+def boards(seed):
+    rng = random.Random(seed)
+    random.seed(seed)
+    full_board, puzzle, _ = make_puzzle(rng.choice([30, 45, 55]))
+    yield full_board
+    yield puzzle
+    yield sparse_board(full_board, rng.choice([1, 4, 10, 17]), rng)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_canonical_form_ignores_transforms(seed):
+    for board in boards(seed):
+        canonical = canonical_form(board)
+        assert len(canonical) == 81
+        assert canonical.count("0") == sum(row.count(0) for row in board)
+        for _ in range(4):
+            assert canonical_form(apply_transform(board, random_transform())) == canonical
+        as_board = [[int(ch) for ch in canonical[r * 9:r * 9 + 9]] for r in range(9)]
+        assert canonical_form(as_board) == canonical
+
+
+def test_canonical_form_tells_puzzles_apart():
+    random.seed(1)
+    forms = {canonical_form(make_puzzle(45)[1]) for _ in range(10)}
+    assert len(forms) == 10
+
+
+def test_canonical_form_of_symmetric_boards_is_quick():
+    full_board = [[(3 * r + r // 3 + c) % 9 + 1 for c in range(9)] for r in range(9)]
+    one_band = [row[:] if r < 3 else [0] * 9 for r, row in enumerate(full_board)]
+    for board in ([[0] * 9 for _ in range(9)], one_band, full_board):
+        started = time.perf_counter()
+        canonical = canonical_form(board)
+        assert time.perf_counter() - started < 5
+        assert canonical_form(apply_transform(board, random_transform())) == canonical
+
+
+def test_empty_board():
+    assert canonical_form([[0] * 9 for _ in range(9)]) == "0" * 81
+
+
+def test_variants_stay_valid_and_unique():
+    random.seed(3)
+    full_board, puzzle, _ = make_puzzle(45)
+    variants = list(derive_variants(full_board, puzzle, 5))
+    assert len(variants) == 5
+    for variant_board, variant_puzzle in variants:
+        assert all(variant_puzzle[r][c] in (0, variant_board[r][c]) for r in range(9) for c in range(9))
+        assert sorted(sum(variant_board, [])) == sorted(sum(full_board, []))
+        assert has_unique_solution(variant_puzzle)
+        assert canonical_form(variant_puzzle) == canonical_form(puzzle)
+
+
+def test_index_rejects_symmetric_duplicates(tmp_path):
+    random.seed(4)
+    full_board = generate_full_board()
+    path = str(tmp_path / "index")
+    index = CanonicalIndex(path)
+    assert index.add(canonical_form(full_board))
+    assert not index.add(canonical_form(apply_transform(full_board, random_transform())))
+    index.close()
+    reloaded = CanonicalIndex(path)
+    assert len(reloaded) == 1
+    assert canonical_form(full_board) in reloaded
+    reloaded.close()
@@ -0,0 +1,39 @@
+"""Bulk validation against the per-board checks."""
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from sudogen_core import make_puzzle
+from sudogen_validate import boards_consistent, boards_match, boards_solved, check_boards, correct_counts
+
+
+def test_checks():
+    random.seed(1)
+    full_board, puzzle, _ = make_puzzle(45)
+    broken = [row[:] for row in full_board]
+    broken[0][0], broken[0][1] = broken[0][1], broken[0][0]
+    checks = check_boards([full_board, puzzle, broken], [full_board] * 3, chunk_size=2)
+    assert checks.consistent.tolist() == [True, True, False]
+    assert checks.solved.tolist() == [True, False, False]
+    assert checks.matches.tolist() == [True, False, False]
+    assert correct_counts([full_board], [puzzle], [full_board]).tolist() == [45]
+
+
+@pytest.mark.parametrize("value", [256, 266, -1, 10, 1 << 40])
+def test_out_of_range_values_are_invalid(value):
+    # Values that would wrap around to a valid digit in a narrow integer type must not pass
+    random.seed(2)
+    full_board = make_puzzle(45)[0]
+    board = [row[:] for row in full_board]
+    board[4][4] = full_board[4][4] + value if value > 0 else value
+    assert not boards_consistent([board])[0]
+    assert not boards_solved([board])[0]
+    assert not boards_match([board], [full_board])[0]
+    assert not check_boards([board], [full_board]).consistent[0]
+
+
+def test_rejects_non_integer_boards():
+    with pytest.raises(ValueError):
+        boards_consistent(np.full((1, 9, 9), 1.5))